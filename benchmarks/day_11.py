@@ -0,0 +1,80 @@
+"""Recursive memoized path counting vs the iterative engine on deep chains.
+
+Run from the repository root: python -m benchmarks.day_11 [depth ...]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from src.day_11 import CompiledGraph
+from src.day_11 import count_paths
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+DEFAULT_DEPTHS = (200, 400, 5_000, 100_000)
+
+
+def ladder(depth: int) -> dict[str, list[str]]:
+    # Two parallel rails with a rung per step: deep, and 2^depth paths
+    graph = {}
+    for step in range(depth):
+        outputs = [f"a{step + 1}", f"b{step + 1}"]
+        graph[f"a{step}"] = outputs
+        graph[f"b{step}"] = outputs
+
+    return graph
+
+
+def count_paths_recursive(
+    graph: dict[str, list[str]], current: str, target: str, memo: dict[str, int]
+) -> int:
+    # The original day 11 counter, one Python frame per edge on the path
+    if current == target:
+        return 1
+    if current in memo:
+        return memo[current]
+    if current not in graph:
+        return 0
+
+    total_paths = sum(
+        count_paths_recursive(graph, neighbor, target, memo)
+        for neighbor in graph[current]
+    )
+    memo[current] = total_paths
+
+    return total_paths
+
+
+def compiled_count(graph: dict[str, list[str]], current: str, target: str) -> int:
+    return count_paths(CompiledGraph(graph), current, target)
+
+
+def measure(name: str, count: Callable[..., int], *args: object) -> None:
+    started = time.perf_counter()
+    try:
+        paths = count(*args)
+    except RecursionError:
+        print(f"  {name:<24} RecursionError")
+        return
+    elapsed = time.perf_counter() - started
+
+    print(f"  {name:<24} {elapsed:8.3f}s  {paths.bit_length()}-bit count")
+
+
+def main() -> None:
+    depths = [int(arg) for arg in sys.argv[1:]] or DEFAULT_DEPTHS
+    for depth in depths:
+        graph = ladder(depth)
+        target = f"a{depth}"
+        print(f"Depth {depth:,} ({2 * depth:,} devices)")
+
+        measure("recursive memo", count_paths_recursive, graph, "a0", target, {})
+        measure("compile + Kahn + sweep", compiled_count, graph, "a0", target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Memory and time of the day 9 compressed grid on a large synthetic polygon.
+
+Run from the repository root: python -m benchmarks.day_9 [num_teeth]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from src.day_9 import build_compressed_grid
+from src.day_9 import build_outside_prefix_sums
+from src.day_9 import compress_coordinates
+from src.day_9 import flood_fill_exterior
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+DEFAULT_TEETH = 1250  # ~5k vertices, ~6M compressed cells
+TOOTH_WIDTH = 10
+LOW, HIGH = 100, 1000
+
+
+def comb_polygon(num_teeth: int) -> list[tuple[int, int]]:
+    # Rectilinear comb: flat bottom edge, top edge of alternating tall and
+    # short teeth, every tooth on its own x and y so nothing compresses away
+    right = 2 * num_teeth * TOOTH_WIDTH
+    tiles = [(0, 0), (right, 0)]
+    for tooth in reversed(range(2 * num_teeth)):
+        top = (HIGH if tooth % 2 else LOW) + tooth
+        tiles.append(((tooth + 1) * TOOTH_WIDTH, top))
+        tiles.append((tooth * TOOTH_WIDTH, top))
+
+    return tiles
+
+
+def list_grid_fill(
+    compressed: list[tuple[int, int, int, int]], width: int, height: int
+) -> list[list[str]]:
+    # Previous layout: list-of-lists of one-character strings, 4-way stack fill
+    grid = [["."] * width for _ in range(height)]
+    for i in range(len(compressed)):
+        _, _, cx1, cy1 = compressed[i]
+        _, _, cx2, cy2 = compressed[(i + 1) % len(compressed)]
+        for x in range(min(cx1, cx2) + 1, max(cx1, cx2) + 2):
+            for y in range(min(cy1, cy2) + 1, max(cy1, cy2) + 2):
+                grid[y][x] = "0"
+
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack.pop()
+        if 0 <= x < width and 0 <= y < height and grid[y][x] == ".":
+            grid[y][x] = "!"
+            stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+
+    return grid
+
+
+def bytearray_grid_fill(
+    compressed: list[tuple[int, int, int, int]], width: int, height: int
+) -> list[bytearray]:
+    grid = build_compressed_grid(compressed, width, height, 1)
+    flood_fill_exterior(grid, 0, 0, width, height)
+
+    return grid
+
+
+def measure(name: str, build: Callable[..., object], *args: object) -> None:
+    # Time and peak memory come from separate runs: tracing slows allocation
+    started = time.perf_counter()
+    build(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    result = build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"{name:<28} {elapsed:8.2f}s  peak {peak / 2**20:9.1f} MiB")
+
+
+def main() -> None:
+    num_teeth = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TEETH
+    tiles = comb_polygon(num_teeth)
+    compressed, x_map, y_map = compress_coordinates(tiles)
+    width, height = len(x_map) + 2, len(y_map) + 2
+
+    print(f"{len(tiles)} vertices, {width}x{height} = {width * height:,} cells")
+    measure("bytearray + span fill", bytearray_grid_fill, compressed, width, height)
+    measure("list of str + 4-way fill", list_grid_fill, compressed, width, height)
+
+    grid = bytearray_grid_fill(compressed, width, height)
+    measure("summed-area table", build_outside_prefix_sums, grid)
+
+
+if __name__ == "__main__":
+    main()
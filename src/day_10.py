@@ -1,16 +1,26 @@
+from __future__ import annotations
+
+import math
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from fractions import Fraction
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 DEBUG = os.environ.get("DEBUG") == "1"
 EPS = 1e-9
 LIGHT_ON = 1
 LIGHT_OFF = 0
 
+Machine = tuple[list[int], list[list[int]], list[int]]
+
 
-def read_input(
-    filename: str,
-) -> list[tuple[list[int], list[list[int]], list[int]]]:
+def read_input(filename: str) -> list[Machine]:
     machines = []
 
     with Path(filename).open() as f:
@@ -48,24 +58,24 @@ def read_input(
 
 
 def _gauss_elimination_gf2(
-    matrix: list[list[int]], num_buttons: int, num_lights: int
-) -> tuple[list[list[int]], list[int]]:
+    matrix: list[int], num_buttons: int, num_lights: int
+) -> tuple[list[int], list[int]]:
+    # Rows are bitsets: bit c is button c, bit num_buttons is the target
     pivot_row = 0
     pivot_cols = []
     for col_idx in range(num_buttons):
-        found_pivot = False
+        col_bit = 1 << col_idx
         for row_idx in range(pivot_row, num_lights):
-            if matrix[row_idx][col_idx] == 1:
+            if matrix[row_idx] & col_bit:
                 matrix[pivot_row], matrix[row_idx] = matrix[row_idx], matrix[pivot_row]
-                found_pivot = True
                 break
-        if not found_pivot:
+        else:
             continue
         pivot_cols.append(col_idx)
+        pivot = matrix[pivot_row]
         for row_idx in range(num_lights):
-            if row_idx != pivot_row and matrix[row_idx][col_idx] == 1:
-                for c in range(num_buttons + 1):
-                    matrix[row_idx][c] ^= matrix[pivot_row][c]
+            if row_idx != pivot_row and matrix[row_idx] & col_bit:
+                matrix[row_idx] ^= pivot
         pivot_row += 1
         if pivot_row >= num_lights:
             break
@@ -73,61 +83,78 @@ def _gauss_elimination_gf2(
     return matrix, pivot_cols
 
 
+def _particular_solution_gf2(
+    pivot_cols: list[int], matrix: list[int], num_buttons: int
+) -> int:
+    # All free variables zero: each pivot variable equals its row's target bit
+    solution = 0
+    for row_idx, col_idx in enumerate(pivot_cols):
+        if (matrix[row_idx] >> num_buttons) & 1:
+            solution |= 1 << col_idx
+
+    return solution
+
+
 def _find_best_solution_gf2(
-    matrix: list[list[int]],
+    matrix: list[int],
     num_buttons: int,
     free_vars: list[int],
     pivot_cols: list[int],
 ) -> int:
-    min_presses = float("inf")
-    best_solution = None
-
-    for mask in range(1 << len(free_vars)):
-        solution = [0] * num_buttons
-        for i, var_idx in enumerate(free_vars):
-            solution[var_idx] = (mask >> i) & 1
+    # Null-space basis: flipping free variable f also flips every pivot
+    # variable whose row contains f
+    null_vectors = []
+    for var_idx in free_vars:
+        vector = 1 << var_idx
         for row_idx, col_idx in enumerate(pivot_cols):
-            val = matrix[row_idx][-1]
-            for c in range(num_buttons):
-                if c != col_idx and matrix[row_idx][c] == 1:
-                    val ^= solution[c]
-            solution[col_idx] = val
-        presses = sum(solution)
+            if (matrix[row_idx] >> var_idx) & 1:
+                vector |= 1 << col_idx
+        null_vectors.append(vector)
+
+    # Gray-code order changes one free variable per step, so each candidate
+    # is a single XOR away from the previous one
+    solution = _particular_solution_gf2(pivot_cols, matrix, num_buttons)
+    best_solution = solution
+    min_presses = solution.bit_count()
+    for step in range(1, 1 << len(free_vars)):
+        solution ^= null_vectors[(step & -step).bit_length() - 1]
+        presses = solution.bit_count()
         if presses < min_presses:
             min_presses = presses
             best_solution = solution
 
     if DEBUG:
-        print(f"Best solution: {best_solution}, presses: {min_presses}")
+        best = [(best_solution >> c) & 1 for c in range(num_buttons)]
+        print(f"Best solution: {best}, presses: {min_presses}")
 
     return min_presses
 
 
 def _build_gf2_matrix(
     target: list[int], buttons: list[list[int]], num_lights: int
-) -> list[list[int]]:
-    return [
-        [1 if light_idx in button else 0 for button in buttons] + [target[light_idx]]
-        for light_idx in range(num_lights)
-    ]
+) -> list[int]:
+    num_buttons = len(buttons)
+    matrix = [target[light_idx] << num_buttons for light_idx in range(num_lights)]
+    for button_idx, button in enumerate(buttons):
+        for light_idx in button:
+            matrix[light_idx] |= 1 << button_idx
 
+    return matrix
 
-def _check_gf2_inconsistency(matrix: list[list[int]], num_buttons: int) -> bool:
-    for row in matrix:
-        if all(row[i] == 0 for i in range(num_buttons)) and row[-1] == 1:
-            return True
 
-    return False
+def _check_gf2_inconsistency(matrix: list[int], num_buttons: int) -> bool:
+    # A row with no buttons left but a lit target bit: 0 = 1
+    return any(row == 1 << num_buttons for row in matrix)
 
 
 def _extract_unique_solution_gf2(
-    pivot_cols: list[int], matrix: list[list[int]], num_buttons: int
+    pivot_cols: list[int], matrix: list[int], num_buttons: int
 ) -> int:
-    solution = [0] * num_buttons
-    for row_idx, col_idx in enumerate(pivot_cols):
-        solution[col_idx] = matrix[row_idx][-1]
+    return _particular_solution_gf2(pivot_cols, matrix, num_buttons).bit_count()
+
 
-    return sum(solution)
+def _format_gf2_row(row: int, num_buttons: int) -> list[int]:
+    return [(row >> c) & 1 for c in range(num_buttons + 1)]
 
 
 def solve_lights_gf2(target: list[int], buttons: list[list[int]]) -> int:
@@ -143,14 +170,14 @@ def solve_lights_gf2(target: list[int], buttons: list[list[int]]) -> int:
     if DEBUG:
         print("Initial matrix:")
         for row in matrix:
-            print(row)
+            print(_format_gf2_row(row, num_buttons))
 
     matrix, pivot_cols = _gauss_elimination_gf2(matrix, num_buttons, num_lights)
 
     if DEBUG:
         print("RREF matrix:")
         for row in matrix:
-            print(row)
+            print(_format_gf2_row(row, num_buttons))
 
     if _check_gf2_inconsistency(matrix, num_buttons):
         if DEBUG:
@@ -170,12 +197,81 @@ def solve_lights_gf2(target: list[int], buttons: list[list[int]]) -> int:
     return _find_best_solution_gf2(matrix, num_buttons, free_vars, pivot_cols)
 
 
-def solve_first(file_name: str) -> int:
+def _solve_machine_lights(machine: Machine) -> int:
+    target, buttons, _joltages = machine
+
+    return solve_lights_gf2(target, buttons)
+
+
+def _lights_free_var_count(machine: Machine) -> int:
+    target, buttons, _joltages = machine
+    matrix = _build_gf2_matrix(target, buttons, len(target))
+    _, pivot_cols = _gauss_elimination_gf2(matrix, len(buttons), len(target))
+
+    return len(buttons) - len(pivot_cols)
+
+
+def _solve_machine_joltage(machine: Machine) -> int:
+    _target, buttons, joltages = machine
+
+    return solve_joltage(joltages, buttons)
+
+
+def _joltage_free_var_count(machine: Machine) -> int:
+    _target, buttons, joltages = machine
+    _, pivots = _rref_exact(joltages, buttons)
+
+    return len(buttons) - len(pivots)
+
+
+def _map_machines(
+    solve: Callable[[Machine], int],
+    machines: list[Machine],
+    expected_cost: Callable[[Machine], int],
+    workers: int | None,
+) -> list[int]:
+    if workers is None or workers <= 1:
+        return [solve(machine) for machine in machines]
+
+    # Submit the machines with the most free variables first so a slow one
+    # doesn't start last and leave the other workers idle
+    order = sorted(
+        range(len(machines)),
+        key=lambda idx: expected_cost(machines[idx]),
+        reverse=True,
+    )
+    results = [0] * len(machines)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(solve, machines[idx]): idx for idx in order}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return results
+
+
+def solve_lights_machines(
+    machines: list[Machine], *, workers: int | None = None
+) -> list[int]:
+    """Fewest presses per machine for part 1, in input order."""
+    return _map_machines(
+        _solve_machine_lights, machines, _lights_free_var_count, workers
+    )
+
+
+def solve_joltage_machines(
+    machines: list[Machine], *, workers: int | None = None
+) -> list[int]:
+    """Fewest presses per machine for part 2, in input order."""
+    return _map_machines(
+        _solve_machine_joltage, machines, _joltage_free_var_count, workers
+    )
+
+
+def solve_first(file_name: str, *, workers: int | None = None) -> int:
     machines = read_input(file_name)
     total_presses = 0
 
-    for target, buttons, _joltages in machines:
-        presses = solve_lights_gf2(target, buttons)
+    for presses in solve_lights_machines(machines, workers=workers):
         if presses != float("inf"):
             total_presses += presses
 
@@ -185,13 +281,9 @@ def solve_first(file_name: str) -> int:
     return total_presses
 
 
-def solve_second(file_name: str) -> int:
+def solve_second(file_name: str, *, workers: int | None = None) -> int:
     machines = read_input(file_name)
-    total_presses = 0
-
-    for _target, buttons, joltages in machines:
-        presses = solve_joltage(joltages, buttons)
-        total_presses += presses
+    total_presses = sum(solve_joltage_machines(machines, workers=workers))
 
     if DEBUG:
         print(f"\nTotal joltage presses: {total_presses}")
@@ -236,72 +328,87 @@ def _total_presses(solution: list[float]) -> int:
     return sum(round(x) for x in solution)
 
 
+def _integral_presses(residuals: list[float]) -> int | None:
+    if all(abs(res - round(res)) < EPS for res in residuals):
+        return sum(round(res) for res in residuals)
+
+    return None
+
+
 def _recursive_search(
     free_vars: list[int],
     matrix_data: tuple[list[list[float]], dict[int, int], list[int], int],
     joltage: list[int],
+    buttons: list[list[int]],
 ) -> int:
-    """Perform a recursive search to find the optimal solution.
+    """Depth-first search over free variable values for the fewest presses.
 
     Args:
         free_vars: List of free variable indices
         matrix_data: Tuple of (matrix, pivot_map, pivots, num_buttons)
         joltage: List of joltage values
+        buttons: Counter indices touched by each button
     """
-    matrix, pivot_map, pivots, num_buttons = matrix_data
+    matrix, _pivot_map, pivots, num_buttons = matrix_data
     num_free_vars = len(free_vars)
-    max_joltage, sum_joltage = max(joltage) if joltage else 0, sum(joltage)
-    memo_feasible: dict[tuple[int, tuple[int, ...]], bool] = {}
-
-    def feasible(free_var_idx: int, free_var_values_tuple: tuple[int, ...]) -> bool:
-        state = (free_var_idx, free_var_values_tuple)
-        if state in memo_feasible:
-            return memo_feasible[state]
-
-        free_var_values = list(free_var_values_tuple)
-        res = all(
-            (
-                matrix[pivot_row_idx][num_buttons]
-                - sum(
-                    matrix[pivot_row_idx][free_vars[k]] * float(free_var_values[k])
-                    for k in range(free_var_idx)
-                )
-            )
-            >= -EPS
-            or any(
-                matrix[pivot_row_idx][free_vars[k]] < -EPS
-                for k in range(free_var_idx, num_free_vars)
-            )
-            for pivot_row_idx in range(len(pivots))
-        )
-        memo_feasible[state] = res
-
-        return res
+    sum_joltage = sum(joltage)
+    pivot_rows = range(len(pivots))
+
+    # columns[k][r]: coefficient of free variable k in pivot row r
+    columns = [[matrix[r][free_var] for r in pivot_rows] for free_var in free_vars]
+    # A free variable can't exceed any counter its button feeds
+    caps = [min((joltage[c] for c in buttons[fv]), default=0) for fv in free_vars]
+    # recoverable[k][r]: a free variable at depth >= k can still raise row r
+    recoverable = [
+        [any(col[r] < -EPS for col in columns[k:]) for r in pivot_rows]
+        for k in range(num_free_vars + 1)
+    ]
 
+    # Pivot variable values given the free values assigned so far
+    residuals = [matrix[r][num_buttons] for r in pivot_rows]
+    values = [0] * num_free_vars
     best = float("inf")
-    stack = [(0, [0] * num_free_vars, 0)]  # (index, values, current_sum)
 
-    while stack:
-        i, v, s = stack.pop(0)
-
-        if s >= best or s > sum_joltage or not feasible(i, tuple(v)):
-            continue
+    def search(depth: int, presses: int) -> None:
+        nonlocal best
+        if not all(
+            res >= -EPS or rec
+            for res, rec in zip(residuals, recoverable[depth], strict=True)
+        ):
+            return
+
+        if depth == num_free_vars:
+            pivot_presses = _integral_presses(residuals)
+            if pivot_presses is not None and presses + pivot_presses < best:
+                best = presses + pivot_presses
+                if DEBUG:
+                    print(f"Free values {values}: {best} presses")
+            return
+
+        column = columns[depth]
+        for x in range(min(caps[depth], sum_joltage - presses) + 1):
+            if presses + x >= best:
+                break
+            values[depth] = x
+            for r in pivot_rows:
+                residuals[r] -= column[r] * x
+            search(depth + 1, presses + x)
+            for r in pivot_rows:
+                residuals[r] += column[r] * x
 
-        if i == num_free_vars:
-            fm = {fv: float(val) for fv, val in zip(free_vars, v, strict=True)}
-            sol = _back_substitute(num_buttons, pivot_map, matrix, fm)
-            if _is_valid_solution(sol):
-                best = min(best, _total_presses(sol))
-            continue
+        values[depth] = 0
 
-        for x in range(min(max_joltage, sum_joltage - s), -1, -1):
-            v[i] = x
-            stack.insert(0, (i + 1, v[:], s + x))
+    search(0, 0)
 
     return best
 
 
-def solve_joltage(joltage: list[int], buttons: list[list[int]]) -> int:
+def solve_joltage(
+    joltage: list[int], buttons: list[list[int]], *, exact: bool = True
+) -> int:
+    if exact:
+        return _solve_joltage_exact(joltage, buttons)
+
     num_counters, num_buttons = len(joltage), len(buttons)
     mat = _create_joltage_matrix(joltage, buttons, num_counters)
     pivots, mat = gauss_real(num_counters, num_buttons, mat)
@@ -314,7 +421,7 @@ def solve_joltage(joltage: list[int], buttons: list[list[int]]) -> int:
 
         return _total_presses(sol) if _is_valid_solution(sol) else float("inf")
 
-    return _recursive_search(free, (mat, p_map, pivots, num_buttons), joltage)
+    return _recursive_search(free, (mat, p_map, pivots, num_buttons), joltage, buttons)
 
 
 def gauss_real(
@@ -347,3 +454,253 @@ def gauss_real(
 
 def free_vars(num_buttons: int, pivots: list[int]) -> list[int]:
     return sorted(set(range(num_buttons)) - set(pivots))
+
+
+def _rref_exact(
+    joltage: list[int], buttons: list[list[int]]
+) -> tuple[list[list[Fraction]], list[int]]:
+    num_counters, num_buttons = len(joltage), len(buttons)
+    matrix = [
+        [Fraction(int(i in btn)) for btn in buttons] + [Fraction(joltage[i])]
+        for i in range(num_counters)
+    ]
+    pivots = []
+    pivot_row = 0
+    for col_idx in range(num_buttons):
+        if pivot_row >= num_counters:
+            break
+        row_idx = next(
+            (r for r in range(pivot_row, num_counters) if matrix[r][col_idx]), None
+        )
+        if row_idx is None:
+            continue
+
+        matrix[pivot_row], matrix[row_idx] = matrix[row_idx], matrix[pivot_row]
+        pivot_val = matrix[pivot_row][col_idx]
+        matrix[pivot_row] = [value / pivot_val for value in matrix[pivot_row]]
+
+        for r in range(num_counters):
+            factor = matrix[r][col_idx]
+            if r != pivot_row and factor:
+                matrix[r] = [
+                    a - factor * b
+                    for a, b in zip(matrix[r], matrix[pivot_row], strict=True)
+                ]
+        pivots.append(col_idx)
+        pivot_row += 1
+
+    return matrix, pivots
+
+
+def _run_simplex(
+    tableau: list[list[Fraction]],
+    basis: list[int],
+    costs: list[Fraction],
+    allowed_cols: range,
+) -> None:
+    # Primal simplex with Bland's rule (lowest index enters and leaves), so it
+    # cannot cycle on degenerate vertices
+    while True:
+        basic_costs = [costs[col] for col in basis]
+        entering = None
+        for col in allowed_cols:
+            if col in basis:
+                continue
+            reduced = costs[col] - sum(
+                c * row[col] for c, row in zip(basic_costs, tableau, strict=True) if c
+            )
+            if reduced < 0:
+                entering = col
+                break
+        if entering is None:
+            return
+
+        candidates = [
+            (row[-1] / row[entering], basis[row_idx], row_idx)
+            for row_idx, row in enumerate(tableau)
+            if row[entering] > 0
+        ]
+        if not candidates:
+            msg = "LP relaxation is unbounded"
+            raise ValueError(msg)
+
+        _pivot(tableau, basis, min(candidates)[2], entering)
+
+
+def _pivot(
+    tableau: list[list[Fraction]], basis: list[int], row_idx: int, col_idx: int
+) -> None:
+    pivot_row = tableau[row_idx]
+    pivot_val = pivot_row[col_idx]
+    tableau[row_idx] = pivot_row = [value / pivot_val for value in pivot_row]
+    for r, row in enumerate(tableau):
+        factor = row[col_idx]
+        if r != row_idx and factor:
+            tableau[r] = [a - factor * b for a, b in zip(row, pivot_row, strict=True)]
+    basis[row_idx] = col_idx
+
+
+def _simplex_min(
+    costs: list[Fraction], rows: list[list[Fraction]], rhs: list[Fraction]
+) -> tuple[Fraction, list[Fraction]] | None:
+    """Minimize costs . z subject to rows . z <= rhs and z >= 0, exactly.
+
+    Returns (optimum, z), or None if infeasible. The feasible region must be
+    bounded. Rows with a negative right-hand side get an artificial variable
+    for phase one.
+    """
+    num_vars, num_rows = len(costs), len(rows)
+    artificial = [i for i in range(num_rows) if rhs[i] < 0]
+    num_real = num_vars + num_rows
+    width = num_real + len(artificial)
+
+    tableau = []
+    basis = []
+    for row_idx, (row, bound) in enumerate(zip(rows, rhs, strict=True)):
+        sign = -1 if bound < 0 else 1
+        line = [Fraction(0)] * (width + 1)
+        line[:num_vars] = [sign * a for a in row]
+        line[num_vars + row_idx] = Fraction(sign)
+        line[-1] = sign * bound
+        if bound < 0:
+            col_idx = num_real + artificial.index(row_idx)
+            line[col_idx] = Fraction(1)
+            basis.append(col_idx)
+        else:
+            basis.append(num_vars + row_idx)
+        tableau.append(line)
+
+    if artificial:
+        phase_one = [Fraction(0)] * num_real + [Fraction(1)] * len(artificial)
+        _run_simplex(tableau, basis, phase_one, range(width))
+        if any(tableau[r][-1] for r, col in enumerate(basis) if col >= num_real):
+            return None
+
+        # Move zero-level artificials out of the basis where possible
+        for row_idx, col in enumerate(basis):
+            if col >= num_real:
+                entering = next(
+                    (c for c in range(num_real) if tableau[row_idx][c]), None
+                )
+                if entering is not None:
+                    _pivot(tableau, basis, row_idx, entering)
+
+    phase_two = list(costs) + [Fraction(0)] * (width - num_vars)
+    _run_simplex(tableau, basis, phase_two, range(num_real))
+
+    solution = [Fraction(0)] * num_vars
+    for row_idx, col in enumerate(basis):
+        if col < num_vars:
+            solution[col] = tableau[row_idx][-1]
+
+    return sum(c * z for c, z in zip(costs, solution, strict=True)), solution
+
+
+def _lp_relaxation(
+    pivot_rows: list[tuple[Fraction, list[Fraction], int]],
+    objective: list[Fraction],
+    lower: list[int],
+    upper: list[int],
+) -> tuple[Fraction, list[Fraction]] | None:
+    # Shift free variables to z = y - lower so the LP only needs z >= 0
+    rows = []
+    rhs = []
+    for constant, coeffs, cap in pivot_rows:
+        offset = constant - sum(a * lo for a, lo in zip(coeffs, lower, strict=True))
+        rows.append(coeffs)  # pivot >= 0
+        rhs.append(offset)
+        rows.append([-a for a in coeffs])  # pivot <= cap
+        rhs.append(cap - offset)
+    for idx, (lo, hi) in enumerate(zip(lower, upper, strict=True)):
+        unit = [Fraction(0)] * len(lower)
+        unit[idx] = Fraction(1)
+        rows.append(unit)
+        rhs.append(Fraction(hi - lo))
+
+    relaxed = _simplex_min(objective, rows, rhs)
+    if relaxed is None:
+        return None
+
+    value, shifted = relaxed
+    base = sum(c * lo for c, lo in zip(objective, lower, strict=True))
+
+    return value + base, [z + lo for z, lo in zip(shifted, lower, strict=True)]
+
+
+def _with_bound(bounds: list[int], idx: int, value: int) -> list[int]:
+    return [*bounds[:idx], value, *bounds[idx + 1 :]]
+
+
+def _split_at_point(
+    lower: list[int], upper: list[int], point: list[Fraction]
+) -> list[tuple[list[int], list[int]]]:
+    # Integral free values but fractional pivots: fix the widest free
+    # variable at its LP value and search either side of it
+    open_vars = [k for k in range(len(lower)) if lower[k] < upper[k]]
+    if not open_vars:
+        return []
+
+    k = max(open_vars, key=lambda idx: upper[idx] - lower[idx])
+    fixed = int(point[k])
+    boxes = []
+    if fixed > lower[k]:
+        boxes.append((lower, _with_bound(upper, k, fixed - 1)))
+    if fixed < upper[k]:
+        boxes.append((_with_bound(lower, k, fixed + 1), upper))
+    boxes.append((_with_bound(lower, k, fixed), _with_bound(upper, k, fixed)))
+
+    return boxes
+
+
+def _solve_joltage_exact(joltage: list[int], buttons: list[list[int]]) -> int:
+    matrix, pivots = _rref_exact(joltage, buttons)
+    if any(row[-1] for row in matrix[len(pivots) :]):
+        return float("inf")
+
+    num_buttons = len(buttons)
+    free = free_vars(num_buttons, pivots)
+    # A button can't be pressed more often than its smallest counter allows
+    caps = [min((joltage[i] for i in btn), default=0) for btn in buttons]
+
+    # Each pivot variable is constant - coeffs . free_values
+    pivot_rows = [
+        (matrix[row_idx][-1], [matrix[row_idx][f] for f in free], caps[col_idx])
+        for row_idx, col_idx in enumerate(pivots)
+    ]
+    base_presses = sum(constant for constant, _, _ in pivot_rows)
+    objective = [
+        1 - sum(coeffs[k] for _, coeffs, _ in pivot_rows) for k in range(len(free))
+    ]
+
+    best = float("inf")
+    stack = [([0] * len(free), [caps[f] for f in free])]
+    while stack:
+        lower, upper = stack.pop()
+        relaxed = _lp_relaxation(pivot_rows, objective, lower, upper)
+        if relaxed is None:
+            continue
+        value, point = relaxed
+        if math.ceil(base_presses + value) >= best:
+            continue
+
+        fractional = next((k for k, v in enumerate(point) if v.denominator != 1), None)
+        if fractional is not None:
+            split = math.floor(point[fractional])
+            stack.append((lower, _with_bound(upper, fractional, split)))
+            stack.append((_with_bound(lower, fractional, split + 1), upper))
+            continue
+
+        pivot_values = [
+            constant - sum(a * v for a, v in zip(coeffs, point, strict=True))
+            for constant, coeffs, _ in pivot_rows
+        ]
+        if all(v.denominator == 1 for v in pivot_values):
+            # The relaxation's optimum is integral, so nothing here beats it
+            best = int(base_presses + value)
+        else:
+            stack.extend(_split_at_point(lower, upper, point))
+
+    if DEBUG:
+        print(f"Exact joltage solution: {best} presses, free variables {free}")
+
+    return best
@@ -1,4 +1,15 @@
+from __future__ import annotations
+
+import itertools
+from array import array
+from functools import cached_property
+from functools import cmp_to_key
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 START_NODE_P1 = "you"
 END_NODE_P1 = "out"
@@ -6,6 +17,8 @@ START_NODE_P2 = "svr"
 END_NODE_P2 = "out"
 WAYPOINT_DAC = "dac"
 WAYPOINT_FFT = "fft"
+MAX_WAYPOINTS = 16  # Each node keeps 2^k path counts
+CACHE_SIZE = 32  # Targets whose all-sources counts PathCounter keeps
 
 
 def read_input(filename: str) -> dict[str, list[str]]:
@@ -21,61 +34,371 @@ def read_input(filename: str) -> dict[str, list[str]]:
     return graph
 
 
-def count_paths_memoized(
-    graph: dict[str, list[str]], current: str, target: str, memo: dict[str, int]
-) -> int:
-    if current == target:
-        return 1
-    if current in memo:
-        return memo[current]
-    if current not in graph:
-        return 0
+class CompiledGraph:
+    """Device graph with names interned to ints and CSR adjacency.
 
-    total_paths = sum(
-        count_paths_memoized(graph, neighbor, target, memo)
-        for neighbor in graph[current]
-    )
-    memo[current] = total_paths
+    The outputs of node i are targets[offsets[i] : offsets[i + 1]].
+    """
+
+    def __init__(self, adjacency: dict[str, list[str]]) -> None:
+        # Output-only devices (like "out") get ids too
+        everything = itertools.chain(
+            adjacency, itertools.chain.from_iterable(adjacency.values())
+        )
+        self.names = list(dict.fromkeys(everything))
+        self.ids = {name: idx for idx, name in enumerate(self.names)}
+
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        for name in self.names:
+            self.targets.extend(self.ids[output] for output in adjacency.get(name, ()))
+            self.offsets.append(len(self.targets))
+
+        self.out_degree = array(
+            "I", (end - start for start, end in itertools.pairwise(self.offsets))
+        )
+        self.in_degree = array("I", [0]) * len(self.names)
+        for target in self.targets:
+            self.in_degree[target] += 1
+
+    @classmethod
+    def from_file(cls, filename: str) -> CompiledGraph:
+        return cls(read_input(filename))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def successors(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    @cached_property
+    def topological_order(self) -> array:
+        """Node ids with every device before all of its outputs (Kahn's).
+
+        Raises ValueError naming one cycle if the graph is not a DAG.
+        """
+        remaining = array("I", self.in_degree)
+        order = array("I", (node for node in range(len(self)) if not remaining[node]))
+        # order doubles as the queue: everything before idx has been expanded
+        idx = 0
+        while idx < len(order):
+            for output in self.successors(order[idx]):
+                remaining[output] -= 1
+                if not remaining[output]:
+                    order.append(output)
+            idx += 1
+
+        if len(order) < len(self):
+            cycle = " -> ".join(
+                self.names[node] for node in self._find_cycle(remaining)
+            )
+            msg = f"Device graph has a cycle: {cycle}"
+            raise ValueError(msg)
+
+        return order
+
+    def _find_cycle(self, remaining: array) -> list[int]:
+        # Nodes Kahn's left behind each keep an unprocessed input that was
+        # also left behind, so walking those inputs backwards must repeat
+        inputs: dict[int, int] = {}
+        for node in range(len(self)):
+            if remaining[node]:
+                for output in self.successors(node):
+                    if remaining[output]:
+                        inputs[output] = node
+
+        path = [next(iter(inputs))]
+        position = {path[0]: 0}
+        while (node := inputs[path[-1]]) not in position:
+            position[node] = len(path)
+            path.append(node)
+        cycle = path[position[node] :]
+        cycle.reverse()
+
+        return [*cycle, cycle[0]]
+
+    @cached_property
+    def _inputs(self) -> tuple[array, array]:
+        # Reverse CSR: the inputs of node i are sources[offsets[i] : offsets[i + 1]]
+        offsets = array("I", [0])
+        for degree in self.in_degree:
+            offsets.append(offsets[-1] + degree)
+        fill = array("I", offsets[:-1])
+        sources = array("I", [0]) * len(self.targets)
+        for node in range(len(self)):
+            for output in self.successors(node):
+                sources[fill[output]] = node
+                fill[output] += 1
+
+        return offsets, sources
+
+    def predecessors(self, node: int) -> array:
+        offsets, sources = self._inputs
+        return sources[offsets[node] : offsets[node + 1]]
+
+    def reachable(self, start: int, end: int) -> bytearray:
+        # Paths stop at end, so nothing past it is expanded
+        seen = bytearray(len(self))
+        seen[start] = 1
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node == end:
+                continue
+            for output in self.successors(node):
+                if not seen[output]:
+                    seen[output] = 1
+                    stack.append(output)
+
+        return seen
+
+    def coreachable(self, end: int) -> bytearray:
+        """Mask of the nodes with at least one path to end."""
+        seen = bytearray(len(self))
+        seen[end] = 1
+        stack = [end]
+        while stack:
+            for source in self.predecessors(stack.pop()):
+                if not seen[source] and source != end:
+                    seen[source] = 1
+                    stack.append(source)
+
+        return seen
+
+    def path_nodes(self, start: int, end: int) -> bytearray:
+        """Mask of the nodes on at least one start -> end path."""
+        reachable = self.reachable(start, end)
+        coreachable = self.coreachable(end)
+
+        return bytearray(a & b for a, b in zip(reachable, coreachable, strict=True))
+
+    def order_to(self, end: int, nodes: bytearray) -> tuple[array, array]:
+        """Kahn's over the reversed subgraph on nodes, starting from end.
+
+        Returns the order, each node after all of its outputs, and per node
+        the outputs left unprocessed: nonzero only for nodes that reach a
+        cycle on the way to end. Edges out of end are ignored.
+        """
+        pending = array("I", [0]) * len(self)
+        for node in range(len(self)):
+            if nodes[node] and node != end:
+                pending[node] = sum(nodes[output] for output in self.successors(node))
+
+        order = array("I", [end])
+        idx = 0
+        while idx < len(order):
+            for source in self.predecessors(order[idx]):
+                if nodes[source] and source != end:
+                    pending[source] -= 1
+                    if not pending[source]:
+                        order.append(source)
+            idx += 1
+
+        return order, pending
+
+    def cycle_error(self, start: int, end: int) -> ValueError:
+        # Every node stuck in Kahn's has a stuck output, so following those
+        # from start must come back round to a cycle on a start -> end path
+        nodes = self.path_nodes(start, end)
+        _, pending = self.order_to(end, nodes)
+        path = [start]
+        position = {start: 0}
+        while True:
+            node = next(
+                output
+                for output in self.successors(path[-1])
+                if nodes[output] and pending[output]
+            )
+            if node in position:
+                break
+            position[node] = len(path)
+            path.append(node)
+
+        cycle = " -> ".join(
+            self.names[node] for node in [*path[position[node] :], node]
+        )
 
-    return total_paths
+        return ValueError(f"Device graph has a cycle: {cycle}")
+
+
+def count_paths_to(graph: CompiledGraph, end: int) -> list[int | None]:
+    """Paths to end from every node, in one reverse Kahn's pass.
+
+    Nodes whose paths to end run into a cycle get None.
+    """
+    nodes = graph.coreachable(end)
+    order, pending = graph.order_to(end, nodes)
+
+    paths: list[int | None] = [0] * len(graph)
+    paths[end] = 1
+    for node in order:
+        for source in graph.predecessors(node):
+            if nodes[source] and source != end:
+                paths[source] += paths[node]
+
+    for node in range(len(graph)):
+        if pending[node]:
+            paths[node] = None
+
+    return paths
+
+
+def count_paths(graph: CompiledGraph, start: str, end: str) -> int:
+    if start not in graph.ids or end not in graph.ids:
+        return int(start == end)
+
+    start_id, end_id = graph.ids[start], graph.ids[end]
+    paths = count_paths_to(graph, end_id)[start_id]
+    if paths is None:
+        raise graph.cycle_error(start_id, end_id)
+
+    return paths
 
 
 def solve_first(file_name: str) -> int:
-    graph = read_input(file_name)
+    graph = CompiledGraph.from_file(file_name)
+
+    return count_paths(graph, START_NODE_P1, END_NODE_P1)
+
+
+def _waypoint_bits(graph: CompiledGraph, waypoints: list[str]) -> list[int]:
+    waypoint_bits = [0] * len(graph)
+    for bit, waypoint in enumerate(waypoints):
+        if waypoint in graph.ids:
+            waypoint_bits[graph.ids[waypoint]] |= 1 << bit
+
+    return waypoint_bits
+
+
+def _add_row(row: list[int], other: list[int]) -> None:
+    for need, count in enumerate(other):
+        if count:
+            row[need] += count
+
+
+def _sum_into_inputs(
+    graph: CompiledGraph,
+    nodes: bytearray,
+    end: int,
+    node: int,
+    rows: list[list[int] | None],
+) -> None:
+    row = rows[node]
+    for source in graph.predecessors(node):
+        if nodes[source] and source != end:
+            if rows[source] is None:
+                rows[source] = [0] * len(row)
+            _add_row(rows[source], row)
 
-    return count_paths_memoized(graph, START_NODE_P1, END_NODE_P1, {})
 
+def _cover_waypoints(row: list[int], bits: int) -> None:
+    # Visiting a waypoint covers its bits of whatever is still needed. The
+    # source index has those bits cleared, so it is never overwritten first.
+    for need in range(len(row)):
+        if need & bits:
+            row[need] = row[need & ~bits]
 
-def count_paths_with_waypoints_unordered(
-    graph: dict[str, list[str]],
-    current: str,
-    waypoints_to_visit: frozenset[str],
-    memo: dict[tuple[str, frozenset[str]], int],
+
+def count_paths_through(
+    graph: CompiledGraph, start: str, end: str, waypoints: list[str]
 ) -> int:
-    state = (current, waypoints_to_visit)
-    if state in memo:
-        return memo[state]
+    """Count start -> end paths that visit every waypoint, in any order.
 
-    remaining_waypoints = waypoints_to_visit - {current}
+    Bottom-up over (node, mask of waypoints still needed) on the nodes of
+    start -> end paths: a finished row of 2^k counts is summed into its
+    inputs' rows and dropped, so the cost is O((V + E) * 2^k) and only the
+    sweep's frontier holds rows.
+    """
+    if len(waypoints) > MAX_WAYPOINTS:
+        msg = f"At most {MAX_WAYPOINTS} waypoints are supported, got {len(waypoints)}"
+        raise ValueError(msg)
 
-    if current == END_NODE_P2:
-        return 1 if not remaining_waypoints else 0
+    ids = graph.ids
+    if start not in ids or end not in ids:
+        return int(start == end and not set(waypoints) - {start})
 
-    count = 0
-    if current in graph:
-        for neighbor in graph[current]:
-            count += count_paths_with_waypoints_unordered(
-                graph, neighbor, remaining_waypoints, memo
-            )
+    start_id, end_id = ids[start], ids[end]
+    nodes = graph.path_nodes(start_id, end_id)
+    if not nodes[start_id]:
+        return 0
+
+    order, pending = graph.order_to(end_id, nodes)
+    if pending[start_id]:
+        raise graph.cycle_error(start_id, end_id)
+
+    waypoint_bits = _waypoint_bits(graph, waypoints)
+    size = 1 << len(waypoints)
+    rows: list[list[int] | None] = [None] * len(graph)
+    rows[end_id] = [1] + [0] * (size - 1)  # Only an empty need is met at the end
+
+    # Every node on a start -> end path is reachable from start, so start
+    # comes last and every row is finished when its node is reached
+    for node in order:
+        row = rows[node]
+        if waypoint_bits[node]:
+            _cover_waypoints(row, waypoint_bits[node])
+        if node == start_id:
+            return row[size - 1]
+
+        _sum_into_inputs(graph, nodes, end_id, node, rows)
+        rows[node] = None
+
+    return 0
+
+
+class PathCounter:
+    """Path-count queries against one graph, answered from cached sweeps.
+
+    Each distinct target costs one count_paths_to pass; the last
+    cache_size targets are kept, so repeated queries are lookups.
+    """
+
+    def __init__(self, graph: CompiledGraph, *, cache_size: int = CACHE_SIZE) -> None:
+        self.graph = graph
+        # Per instance, so the cache goes away with the counter
+        self.paths_to = lru_cache(maxsize=cache_size)(self._paths_to)
+
+    @classmethod
+    def from_file(cls, filename: str, *, cache_size: int = CACHE_SIZE) -> PathCounter:
+        return cls(CompiledGraph.from_file(filename), cache_size=cache_size)
+
+    def _paths_to(self, end: int) -> list[int | None]:
+        return count_paths_to(self.graph, end)
+
+    def _compare(self, first: int, second: int) -> int:
+        # Of two stops on one acyclic path, only the earlier reaches the other
+        return -1 if self.paths_to(second)[first] != 0 else 1
+
+    def count(self, src: str, dst: str, via: Iterable[str] = ()) -> int:
+        """Count src -> dst paths that pass through every device in via.
+
+        A path without cycles meets its devices in a fixed order, so the
+        count is the product of the segments between consecutive stops.
+        If no path meets them all, some segment in any order is 0.
+        """
+        ids = self.graph.ids
+        stops = {src, dst, *via}
+        if not stops <= ids.keys():
+            return int(stops == {src})
+
+        inner = {ids[name] for name in stops} - {ids[src], ids[dst]}
+        stops_in_order = sorted(inner, key=cmp_to_key(self._compare))
 
-    memo[state] = count
+        total = 1
+        for first, second in itertools.pairwise([ids[src], *stops_in_order, ids[dst]]):
+            paths = self.paths_to(second)[first]
+            if paths is None:
+                raise self.graph.cycle_error(first, second)
+            total *= paths
+            if not total:
+                break
 
-    return count
+        return total
 
 
 def solve_second(file_name: str) -> int:
-    graph = read_input(file_name)
+    graph = CompiledGraph.from_file(file_name)
 
-    return count_paths_with_waypoints_unordered(
-        graph, START_NODE_P2, frozenset([WAYPOINT_DAC, WAYPOINT_FFT]), {}
+    return count_paths_through(
+        graph, START_NODE_P2, END_NODE_P2, [WAYPOINT_DAC, WAYPOINT_FFT]
     )
@@ -1,7 +1,6 @@
 from pathlib import Path
 
 FILLED_CHAR = "#"
-EMPTY_CELL = 0
 PARITY_EVEN = 0
 MAX_ITERATIONS_BASE = 10000
 MAX_ITERATIONS_CAP = 500000
@@ -99,47 +98,32 @@ def get_orientations(shape: set[tuple[int, int]]) -> list[set[tuple[int, int]]]:
     return orientations
 
 
-def can_place(
-    grid: list[list[int]], shape: set[tuple[int, int]], row: int, col: int
-) -> bool:
-    for dr, dc in shape:
-        r, c = row + dr, col + dc
-        if r < 0 or r >= len(grid) or c < 0 or c >= len(grid[0]):
-            return False
-        if grid[r][c] != EMPTY_CELL:
-            return False
-
-    return True
-
-
-def place(
-    grid: list[list[int]],
-    shape: set[tuple[int, int]],
-    row: int,
-    col: int,
-    label: int,
-) -> None:
-    for dr, dc in shape:
-        r, c = row + dr, col + dc
-        grid[r][c] = label
-
-
-def unplace(
-    grid: list[list[int]], shape: set[tuple[int, int]], row: int, col: int
-) -> None:
-    for dr, dc in shape:
-        r, c = row + dr, col + dc
-        grid[r][c] = EMPTY_CELL
-
-
-def find_first_empty(grid: list[list[int]]) -> tuple[int, int] | None:
-    """Find the first empty cell (top-left to bottom-right)."""
-    for row in range(len(grid)):
-        for col in range(len(grid[0])):
-            if grid[row][col] == EMPTY_CELL:
-                return row, col
+def compile_orientation(shape: set[tuple[int, int]], width: int) -> int:
+    """Bitmask of shape anchored at (0, 0) on a board whose rows are width bits."""
+    mask = 0
+    for r, c in shape:
+        mask |= 1 << (r * width + c)
+
+    return mask
+
+
+def placement_masks(
+    orientations: list[set[tuple[int, int]]], width: int, height: int
+) -> list[int]:
+    """Every in-bounds placement, by orientation, then row, then column."""
+    masks = []
+    for shape in orientations:
+        mask = compile_orientation(shape, width)
+        shape_height = max(r for r, _ in shape) + 1
+        shape_width = max(c for _, c in shape) + 1
+        # Anchors that keep the shape on the board, so shifts never wrap rows
+        masks.extend(
+            mask << (row * width + col)
+            for row in range(height - shape_height + 1)
+            for col in range(width - shape_width + 1)
+        )
 
-    return None
+    return masks
 
 
 def solve_region(
@@ -148,15 +132,23 @@ def solve_region(
     presents: list[tuple[int, list[set[tuple[int, int]]]]],
     max_iterations: int = 50000,
 ) -> bool:
-    """Try to fit all presents using backtracking with iteration limit."""
+    """Try to fit all presents using backtracking with iteration limit.
+
+    The board is one int with bit row * width + col set for filled cells,
+    so testing and placing a present are a single AND and OR.
+    """
     total_area = sum(len(orientations[0]) for _, orientations in presents)
     if total_area > width * height:
         return False
 
-    grid = [[EMPTY_CELL] * width for _ in range(height)]
+    placements: dict[int, list[int]] = {}
+    for shape_id, orientations in presents:
+        if shape_id not in placements:
+            placements[shape_id] = placement_masks(orientations, width, height)
+
     iterations = [0]
 
-    def backtrack(present_idx: int) -> bool:
+    def backtrack(present_idx: int, board: int) -> bool:
         iterations[0] += 1
         if iterations[0] > max_iterations:
             return False
@@ -164,20 +156,15 @@ def solve_region(
         if present_idx == len(presents):
             return True
 
-        _shape_id, orientations = presents[present_idx]
+        shape_id, _orientations = presents[present_idx]
 
-        for shape in orientations:
-            for row in range(height):
-                for col in range(width):
-                    if can_place(grid, shape, row, col):
-                        place(grid, shape, row, col, present_idx + 1)
-                        if backtrack(present_idx + 1):
-                            return True
-                        unplace(grid, shape, row, col)
+        for mask in placements[shape_id]:
+            if not board & mask and backtrack(present_idx + 1, board | mask):
+                return True
 
         return False
 
-    return backtrack(0)
+    return backtrack(0, 0)
 
 
 def get_parity(shape: set[tuple[int, int]]) -> tuple[int, int]:
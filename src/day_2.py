@@ -1,5 +1,12 @@
+from __future__ import annotations
+
+import heapq
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 
@@ -45,6 +52,89 @@ def is_invalid_id(num: int) -> bool:
     return result
 
 
+def _covered_periods(num_digits: int, *, any_repeats: bool) -> list[int]:
+    # Pattern lengths whose repetitions fill num_digits. Part 1 only allows a
+    # pattern repeated exactly twice, but "1111" is also "11" twice, so every
+    # divisor of the half length is covered as well.
+    if any_repeats:
+        return [p for p in range(1, num_digits // 2 + 1) if num_digits % p == 0]
+
+    if num_digits % 2 != 0:
+        return []
+
+    half = num_digits // 2
+
+    return [p for p in range(1, half + 1) if half % p == 0]
+
+
+def _pattern_bounds(
+    start: int, end: int, num_digits: int, pattern_len: int
+) -> tuple[int, int, int]:
+    # Every num_digits-long number built from a pattern_len-long pattern is
+    # pattern * multiplier, e.g. 123123 = 123 * 1001
+    multiplier = (10**num_digits - 1) // (10**pattern_len - 1)
+    low = max(start, 10 ** (num_digits - 1))
+    high = min(end, 10**num_digits - 1)
+
+    return -(-low // multiplier), high // multiplier, multiplier
+
+
+def _is_primitive_pattern(pattern: int) -> bool:
+    # A string is periodic iff it occurs inside itself doubled, minus the ends
+    s = str(pattern)
+
+    return s not in (s + s)[1:-1]
+
+
+def _iter_primitive_multiples(first: int, last: int, multiplier: int) -> Iterator[int]:
+    for pattern in range(first, last + 1):
+        if _is_primitive_pattern(pattern):
+            yield pattern * multiplier
+
+
+def iter_invalid_ids(
+    start: int, end: int, *, any_repeats: bool = False
+) -> Iterator[int]:
+    """Yield invalid IDs in [start, end] in ascending order.
+
+    Each ID is produced once, from its shortest repeating pattern.
+    """
+    for num_digits in range(len(str(start)), len(str(end)) + 1):
+        streams = []
+        for period in _covered_periods(num_digits, any_repeats=any_repeats):
+            first, last, multiplier = _pattern_bounds(start, end, num_digits, period)
+            streams.append(_iter_primitive_multiples(first, last, multiplier))
+
+        yield from heapq.merge(*streams)
+
+
+def sum_invalid_ids(start: int, end: int, *, any_repeats: bool = False) -> int:
+    """Sum invalid IDs in [start, end] without visiting the range.
+
+    Work depends only on the number of digit lengths the range spans.
+    """
+    total = 0
+    for num_digits in range(len(str(start)), len(str(end)) + 1):
+        # primitive_sums[p]: sum of IDs whose shortest repeating pattern has
+        # length p, found by removing every shorter period that divides p
+        primitive_sums: dict[int, int] = {}
+        for period in _covered_periods(num_digits, any_repeats=any_repeats):
+            first, last, multiplier = _pattern_bounds(start, end, num_digits, period)
+            periodic_sum = 0
+            if first <= last:
+                periodic_sum = multiplier * (first + last) * (last - first + 1) // 2
+
+            primitive_sums[period] = periodic_sum - sum(
+                value
+                for shorter, value in primitive_sums.items()
+                if period % shorter == 0
+            )
+
+        total += sum(primitive_sums.values())
+
+    return total
+
+
 def solve_first(file_name: str) -> int:
     ranges = read_input(file_name)
     total = 0
@@ -54,19 +144,20 @@ def solve_first(file_name: str) -> int:
         if DEBUG:
             print(f"\nChecking range {start}-{end}")
 
-        range_invalids = []
-        for num in range(start, end + 1):
-            if is_invalid_id(num):
-                total += num
-                invalid_count += 1
-                range_invalids.append(num)
+        total += sum_invalid_ids(start, end)
+
+        if not DEBUG:
+            continue
+
+        range_invalids = list(iter_invalid_ids(start, end))
+        invalid_count += len(range_invalids)
 
-        if DEBUG and range_invalids:
+        if range_invalids:
             print(
                 f"  Range {start}-{end} has "
                 f"{len(range_invalids)} invalid IDs: {range_invalids}"
             )
-        elif DEBUG:
+        else:
             print(f"  Range {start}-{end} has no invalid IDs")
 
     if DEBUG:
@@ -119,19 +210,20 @@ def solve_second(file_name: str) -> int:
         if DEBUG:
             print(f"\nChecking range {start}-{end}")
 
-        range_invalids = []
-        for num in range(start, end + 1):
-            if is_invalid_id_v2(num):
-                total += num
-                invalid_count += 1
-                range_invalids.append(num)
+        total += sum_invalid_ids(start, end, any_repeats=True)
+
+        if not DEBUG:
+            continue
+
+        range_invalids = list(iter_invalid_ids(start, end, any_repeats=True))
+        invalid_count += len(range_invalids)
 
-        if DEBUG and range_invalids:
+        if range_invalids:
             print(
                 f"  Range {start}-{end} has "
                 f"{len(range_invalids)} invalid IDs: {range_invalids}"
             )
-        elif DEBUG:
+        else:
             print(f"  Range {start}-{end} has no invalid IDs")
 
     if DEBUG:
@@ -1,7 +1,24 @@
+from __future__ import annotations
+
+import itertools
 import os
+import sys
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
 from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import BinaryIO
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+CHUNK_SIZE = 1024  # Banks per process-pool task
+BATTERIES_FIRST = 2
+BATTERIES_SECOND = 12
+INT_DIGITS = 4000  # Below Python's default int/str conversion limit of 4300
 
 
 def read_input(filename: str) -> list[str]:
@@ -9,75 +26,158 @@ def read_input(filename: str) -> list[str]:
         return [line.strip() for line in f if line.strip()]
 
 
+def iter_banks(source: str | Path | BinaryIO) -> Iterator[bytes]:
+    """Lazily yield non-empty banks from a path, "-" for stdin, or a binary stream."""
+    if isinstance(source, str | Path):
+        if str(source) == "-":
+            yield from iter_banks(sys.stdin.buffer)
+            return
+
+        with Path(source).open("rb") as f:
+            yield from iter_banks(f)
+        return
+
+    for line in source:
+        bank = line.strip()
+        if bank:
+            yield bank
+
+
+def _digit_view(bank: str | bytes) -> bytes:
+    # ASCII digits compare in the same order as their values, so no int() calls
+    return bank.encode("ascii") if isinstance(bank, str) else bank
+
+
+def select_max_positions(bank: str | bytes, n: int) -> list[int]:
+    """Return positions of the largest n-digit subsequence of bank, in O(L).
+
+    Monotonic stack: a digit evicts smaller digits before it while enough
+    of the bank remains to still pick n in total.
+    """
+    digits = _digit_view(bank)
+    bank_len = len(digits)
+    if n > bank_len:
+        msg = f"Cannot select {n} batteries from bank of length {bank_len}"  # noqa: S608
+        raise ValueError(msg)
+
+    stack: list[int] = []
+    drops = bank_len - n
+    for pos, digit in enumerate(digits):
+        while drops and stack and digits[stack[-1]] < digit:
+            stack.pop()
+            drops -= 1
+        stack.append(pos)
+
+    return stack[:n]
+
+
+def digits_to_int(digits: str | bytes) -> int:
+    """int() for digit strings of any length, without the 4300-digit limit.
+
+    Splits in half and recombines with one multiply per level, which also
+    avoids int()'s quadratic conversion on long inputs.
+    """
+    if len(digits) <= INT_DIGITS:
+        return int(digits)
+
+    middle = len(digits) // 2
+    high = digits_to_int(digits[:middle])
+    low = digits_to_int(digits[middle:])
+
+    return high * 10 ** (len(digits) - middle) + low
+
+
 def find_max_joltage(bank: str) -> int:
-    max_joltage = 0
-    best_positions = (0, 0)
+    if len(bank) < 2:  # noqa: PLR2004
+        return 0
 
-    for i in range(len(bank)):
-        for j in range(i + 1, len(bank)):
-            joltage = int(bank[i] + bank[j])
-            if joltage > max_joltage:
-                max_joltage = joltage
-                best_positions = (i, j)
+    i, j = select_max_positions(bank, 2)
+    max_joltage = int(bank[i] + bank[j])
 
     if DEBUG:
-        i, j = best_positions
         print(f"  Max joltage: {max_joltage} (positions {i},{j}: {bank[i]}{bank[j]})")
 
     return max_joltage
 
 
-def solve_first(file_name: str) -> int:
-    banks = read_input(file_name)
-    total = 0
+def bank_joltage(bank: str | bytes, n: int, *, skip_short: bool = False) -> int:
+    """Largest n-digit joltage of bank.
 
-    if DEBUG:
-        print(f"Processing {len(banks)} banks\n")
+    A bank shorter than n raises ValueError, or scores 0 with skip_short.
+    """
+    digits = _digit_view(bank)
+    if skip_short and len(digits) < n:
+        return 0
 
-    for bank in banks:
-        if DEBUG:
-            print(f"Bank: {bank}")
+    return digits_to_int(bytes(digits[pos] for pos in select_max_positions(digits, n)))
 
-        max_joltage = find_max_joltage(bank)
-        total += max_joltage
 
-        if DEBUG:
-            print(f"Running total: {total}\n")
+def _chunk_total(banks: Iterable[bytes], n: int, skip_short: bool) -> int:  # noqa: FBT001
+    return sum(bank_joltage(bank, n, skip_short=skip_short) for bank in banks)
 
-    if DEBUG:
-        print(f"Total output joltage: {total}")
+
+def total_joltage(
+    banks: Iterable[bytes],
+    n: int,
+    *,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    skip_short: bool = False,
+) -> int:
+    """Sum every bank's joltage, keeping only a running total in memory.
+
+    With workers, banks go to a process pool in chunks, and at most two
+    chunks per worker are read ahead of the results.
+    """
+    if workers is None or workers <= 1:
+        return _chunk_total(banks, n, skip_short)
+
+    banks = iter(banks)
+    chunks = iter(lambda: list(itertools.islice(banks, chunk_size)), [])
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total += sum(future.result() for future in done)
+            pending.add(pool.submit(_chunk_total, chunk, n, skip_short))
+
+        total += sum(future.result() for future in pending)
 
     return total
 
 
-def find_max_joltage_n_batteries(bank: str, n: int) -> int:
-    bank_len = len(bank)
-    if n > bank_len:
-        msg = f"Cannot select {n} batteries from bank of length {bank_len}"  # noqa: S608
-        raise ValueError(msg)
+def solve_first(file_name: str, *, workers: int | None = None) -> int:
+    if not DEBUG:
+        # Part 1 has always scored too-short banks as 0, as find_max_joltage does
+        return total_joltage(
+            iter_banks(file_name), BATTERIES_FIRST, workers=workers, skip_short=True
+        )
 
-    selected_positions = []
-    start_pos = 0
+    banks = read_input(file_name)
+    total = 0
+
+    print(f"Processing {len(banks)} banks\n")
+
+    for bank in banks:
+        print(f"Bank: {bank}")
+
+        max_joltage = find_max_joltage(bank)
+        total += max_joltage
 
-    for result_pos in range(n):
-        remaining_needed = n - result_pos - 1
+        print(f"Running total: {total}\n")
 
-        max_end_pos = bank_len - remaining_needed
+    print(f"Total output joltage: {total}")
 
-        best_digit = -1
-        best_pos = start_pos
+    return total
 
-        for pos in range(start_pos, max_end_pos):
-            digit = int(bank[pos])
-            if digit > best_digit:
-                best_digit = digit
-                best_pos = pos
 
-        selected_positions.append(best_pos)
-        start_pos = best_pos + 1
+def find_max_joltage_n_batteries(bank: str, n: int) -> int:
+    selected_positions = select_max_positions(bank, n)
 
     result_str = "".join(bank[pos] for pos in selected_positions)
-    result = int(result_str)
+    result = digits_to_int(result_str)
 
     if DEBUG:
         print(f"  Selected positions: {selected_positions}")
@@ -86,24 +186,34 @@ def find_max_joltage_n_batteries(bank: str, n: int) -> int:
     return result
 
 
-def solve_second(file_name: str) -> int:
+def solve_second(
+    file_name: str, *, workers: int | None = None, skip_short: bool = False
+) -> int:
+    """Part 2 total; banks shorter than 12 raise ValueError unless skip_short."""
+    if not DEBUG:
+        return total_joltage(
+            iter_banks(file_name),
+            BATTERIES_SECOND,
+            workers=workers,
+            skip_short=skip_short,
+        )
+
     banks = read_input(file_name)
     total = 0
 
-    if DEBUG:
-        print(f"Processing {len(banks)} banks (selecting 12 batteries each)\n")
+    selecting = f"selecting {BATTERIES_SECOND} batteries each"
+    print(f"Processing {len(banks)} banks ({selecting})\n")
 
     for bank in banks:
-        if DEBUG:
-            print(f"Bank: {bank}")
+        print(f"Bank: {bank}")
 
-        max_joltage = find_max_joltage_n_batteries(bank, 12)
+        max_joltage = 0
+        if not skip_short or len(bank) >= BATTERIES_SECOND:
+            max_joltage = find_max_joltage_n_batteries(bank, BATTERIES_SECOND)
         total += max_joltage
 
-        if DEBUG:
-            print(f"Running total: {total}\n")
+        print(f"Running total: {total}\n")
 
-    if DEBUG:
-        print(f"Total output joltage: {total}")
+    print(f"Total output joltage: {total}")
 
     return total
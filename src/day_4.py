@@ -1,5 +1,16 @@
+from __future__ import annotations
+
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 
@@ -41,12 +52,35 @@ def count_neighbors(grid: list[str], row: int, col: int) -> int:
     return count
 
 
+def _rolls_array(grid: list[str]) -> np.ndarray:
+    raw = np.frombuffer("".join(grid).encode(), dtype=np.uint8)
+
+    return (raw == ord(PAPER_ROLL)).astype(np.uint8).reshape(len(grid), len(grid[0]))
+
+
+def _neighbor_counts_array(rolls: np.ndarray) -> np.ndarray:
+    # Sum the eight shifted views of the zero-padded grid
+    rows, cols = rolls.shape
+    padded = np.pad(rolls, 1)
+    counts = np.zeros_like(rolls)
+    for dr, dc in DIRECTIONS:
+        counts += padded[1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols]
+
+    return counts
+
+
+def _accessible_mask(rolls: np.ndarray) -> np.ndarray:
+    return (rolls == 1) & (_neighbor_counts_array(rolls) < MAX_NEIGHBORS_FOR_ACCESS)
+
+
 def solve_first(file_name: str) -> int:
     grid = read_input(file_name)
     accessible_count = 0
 
     if DEBUG:
         print(f"Grid size: {len(grid)}x{len(grid[0])}\n")
+    elif np is not None:
+        return int(np.count_nonzero(_accessible_mask(_rolls_array(grid))))
 
     for row in range(len(grid)):
         for col in range(len(grid[0])):
@@ -92,43 +126,99 @@ def find_accessible_rolls_mutable(
     return to_remove
 
 
+def _padded_rolls(grid: list[str]) -> tuple[bytearray, int]:
+    # Flat grid with a one-cell empty border, so neighbours never go out of bounds
+    width = len(grid[0]) + 2
+    is_roll = bytearray(width * (len(grid) + 2))
+
+    for row, line in enumerate(grid):
+        base = (row + 1) * width + 1
+        for col, char in enumerate(line):
+            if char == PAPER_ROLL:
+                is_roll[base + col] = 1
+
+    return is_roll, width
+
+
+def iter_removal_waves(grid: list[str]) -> Iterator[list[tuple[int, int]]]:
+    """Yield the rolls removed in each wave until none are accessible.
+
+    Neighbour counts are computed once and decremented as rolls go, so each
+    wave only re-examines cells next to the previous one.
+    """
+    is_roll, width = _padded_rolls(grid)
+    offsets = [dr * width + dc for dr, dc in DIRECTIONS]
+
+    counts = [0] * len(is_roll)
+    wave = []
+    for cell, roll in enumerate(is_roll):
+        if roll:
+            counts[cell] = sum(is_roll[cell + offset] for offset in offsets)
+            if counts[cell] < MAX_NEIGHBORS_FOR_ACCESS:
+                wave.append(cell)
+
+    while wave:
+        yield [(cell // width - 1, cell % width - 1) for cell in wave]
+
+        for cell in wave:
+            is_roll[cell] = 0
+
+        next_wave = []
+        for cell in wave:
+            for offset in offsets:
+                neighbor = cell + offset
+                if is_roll[neighbor]:
+                    counts[neighbor] -= 1
+                    # Counts only fall, so each roll crosses the threshold once
+                    if counts[neighbor] == MAX_NEIGHBORS_FOR_ACCESS - 1:
+                        next_wave.append(neighbor)
+
+        wave = next_wave
+
+
+def _iter_wave_sizes_array(grid: list[str]) -> Iterator[int]:
+    # Whole-grid recount per wave; cheaper than per-cell Python work on big grids
+    rolls = _rolls_array(grid)
+    while True:
+        accessible = _accessible_mask(rolls)
+        removed_count = int(np.count_nonzero(accessible))
+        if not removed_count:
+            return
+
+        rolls[accessible] = 0
+        yield removed_count
+
+
 def solve_second(file_name: str) -> int:
     lines = read_input(file_name)
-    # Convert to mutable grid (list of lists)
-    grid = [list(line) for line in lines]
-    rows = len(grid)
-    cols = len(grid[0])
+
+    if np is not None and not DEBUG:
+        return sum(_iter_wave_sizes_array(lines))
+
+    rows = len(lines)
+    cols = len(lines[0])
 
     total_removed = 0
     iteration = 0
 
     if DEBUG:
+        # Mutable copy only needed to print the grid between waves
+        grid = [list(line) for line in lines]
         print(f"Initial grid size: {rows}x{cols}")
         print("Initial state:")
         for row in grid:
             print("".join(row))
         print()
 
-    while True:
+    for to_remove in iter_removal_waves(lines):
         iteration += 1
-
-        to_remove = find_accessible_rolls_mutable(grid, rows, cols)
-
-        if not to_remove:
-            if DEBUG:
-                print(
-                    f"No more accessible rolls. "
-                    f"Stopping after {iteration - 1} iterations."
-                )
-            break
-
-        for row, col in to_remove:
-            grid[row][col] = EMPTY_SPACE
-
         removed_count = len(to_remove)
         total_removed += removed_count
 
         if DEBUG:
+            for row, col in to_remove:
+                grid[row][col] = EMPTY_SPACE
+
             print(f"Iteration {iteration}: Removed {removed_count} rolls")
             print(f"Total removed so far: {total_removed}")
             for row in grid:
@@ -136,6 +226,7 @@ def solve_second(file_name: str) -> int:
             print()
 
     if DEBUG:
+        print(f"No more accessible rolls. Stopping after {iteration} iterations.")
         print(f"Final total removed: {total_removed}")
 
     return total_removed
@@ -1,3 +1,4 @@
+import bisect
 import os
 from pathlib import Path
 
@@ -28,17 +29,46 @@ def is_fresh(ingredient_id: int, ranges: list[tuple[int, int]]) -> bool:
     return any(start <= ingredient_id <= end for start, end in ranges)
 
 
+class RangeIndex:
+    """Point lookups against merged ranges via binary search over starts."""
+
+    def __init__(self, ranges: list[tuple[int, int]]) -> None:
+        merged = merge_ranges(ranges)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __contains__(self, ingredient_id: int) -> bool:
+        idx = bisect.bisect_right(self.starts, ingredient_id) - 1
+
+        return idx >= 0 and ingredient_id <= self.ends[idx]
+
+    def count_fresh(self, ingredient_ids: list[int]) -> int:
+        # Sort the queries and sweep both lists once
+        count = 0
+        range_idx = 0
+        num_ranges = len(self.starts)
+
+        for ingredient_id in sorted(ingredient_ids):
+            while range_idx < num_ranges and self.ends[range_idx] < ingredient_id:
+                range_idx += 1
+            if range_idx == num_ranges:
+                break
+            if self.starts[range_idx] <= ingredient_id:
+                count += 1
+
+        return count
+
+
 def solve_first(file_name: str) -> int:
     ranges, ingredient_ids = read_input(file_name)
-    fresh_count = 0
-
-    for ingredient_id in ingredient_ids:
-        if is_fresh(ingredient_id, ranges):
-            fresh_count += 1
-            if DEBUG:
-                print(f"Ingredient ID {ingredient_id}: FRESH")
-        elif DEBUG:
-            print(f"Ingredient ID {ingredient_id}: spoiled")
+    index = RangeIndex(ranges)
+
+    if DEBUG:
+        for ingredient_id in ingredient_ids:
+            status = "FRESH" if ingredient_id in index else "spoiled"
+            print(f"Ingredient ID {ingredient_id}: {status}")
+
+    fresh_count = index.count_fresh(ingredient_ids)
 
     if DEBUG:
         print(f"\nTotal fresh ingredients: {fresh_count}")
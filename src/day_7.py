@@ -1,20 +1,31 @@
+import bisect
 import os
 from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 SYMBOL_START = "S"
 SYMBOL_SPLITTER = "^"
 SYMBOL_EMPTY = "."
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+UINT64_SAFE_ROWS = 63  # Splitter rows before counts may exceed uint64
 
 
 @dataclass
 class BeamState:
-    beam_queue: deque
-    visited_beams: set
-    activated_splitters: set
+    width: int  # Positions are encoded as row * width + col
+    beam_queue: deque[int]
+    visited_beams: set[int]
+    activated_splitters: set[int]
+
+    def encode(self, row: int, col: int) -> int:
+        return row * self.width + col
 
 
 def read_input(filename: str) -> list[str]:
@@ -31,9 +42,52 @@ def find_start(grid: list[str]) -> tuple[int, int]:
     return -1, -1
 
 
-def process_splitter(row: int, col: int, grid: list[str], state: BeamState) -> None:
-    if (row, col) not in state.activated_splitters:
-        state.activated_splitters.add((row, col))
+SplitterRow = tuple[int, list[int], int]  # Row index, splitter columns, row width
+
+
+def find_splitter_rows(grid: list[str], start_row: int = 0) -> list[SplitterRow]:
+    """Splitter columns per row from start_row on, skipping rows with none."""
+    splitter_rows = []
+    for row_idx in range(start_row, len(grid)):
+        row = grid[row_idx]
+        cols = []
+        col = row.find(SYMBOL_SPLITTER)
+        while col != -1:
+            cols.append(col)
+            col = row.find(SYMBOL_SPLITTER, col + 1)
+        if cols:
+            splitter_rows.append((row_idx, cols, len(row)))
+
+    return splitter_rows
+
+
+def index_splitter_columns(
+    splitter_rows: list[SplitterRow], width: int
+) -> list[list[int]]:
+    """Sorted splitter row indices for each column."""
+    columns: list[list[int]] = [[] for _ in range(width)]
+    for row_idx, cols, _ in splitter_rows:
+        for col in cols:
+            columns[col].append(row_idx)
+
+    return columns
+
+
+def queue_beam(row: int, col: int, state: BeamState) -> bool:
+    beam = state.encode(row, col)
+    if beam in state.visited_beams:
+        return False
+
+    state.beam_queue.append(beam)
+    state.visited_beams.add(beam)
+
+    return True
+
+
+def process_splitter(row: int, col: int, row_width: int, state: BeamState) -> None:
+    splitter = state.encode(row, col)
+    if splitter not in state.activated_splitters:
+        state.activated_splitters.add(splitter)
         if DEBUG:
             print(f"  -> Split #{len(state.activated_splitters)} at ({row}, {col})")
     elif DEBUG:
@@ -42,17 +96,11 @@ def process_splitter(row: int, col: int, grid: list[str], state: BeamState) -> N
     left_col = col - 1
     right_col = col + 1
 
-    if left_col >= 0 and (row, left_col) not in state.visited_beams:
-        state.beam_queue.append((row, left_col))
-        state.visited_beams.add((row, left_col))
-        if DEBUG:
-            print(f"    Created left beam at ({row}, {left_col})")
+    if left_col >= 0 and queue_beam(row, left_col, state) and DEBUG:
+        print(f"    Created left beam at ({row}, {left_col})")
 
-    if right_col < len(grid[row]) and (row, right_col) not in state.visited_beams:
-        state.beam_queue.append((row, right_col))
-        state.visited_beams.add((row, right_col))
-        if DEBUG:
-            print(f"    Created right beam at ({row}, {right_col})")
+    if right_col < row_width and queue_beam(row, right_col, state) and DEBUG:
+        print(f"    Created right beam at ({row}, {right_col})")
 
 
 def simulate_beam(grid: list[str]) -> int:
@@ -60,31 +108,32 @@ def simulate_beam(grid: list[str]) -> int:
     if start_row == -1:
         return 0
 
-    state = BeamState(
-        beam_queue=deque([(start_row, start_col)]),
-        visited_beams={(start_row, start_col)},
-        activated_splitters=set(),
-    )
+    width = max(len(row) for row in grid)
+    splitter_rows = find_splitter_rows(grid, start_row)
+    splitter_columns = index_splitter_columns(splitter_rows, width)
+
+    state = BeamState(width, deque(), set(), set())
+    queue_beam(start_row, start_col, state)
 
     if DEBUG:
         print(f"Starting beam at ({start_row}, {start_col})")
 
     while state.beam_queue:
-        row, col = state.beam_queue.popleft()
+        row, col = divmod(state.beam_queue.popleft(), width)
 
-        if DEBUG:
-            print(f"\nProcessing beam at ({row}, {col})")
+        # Jump straight to the first splitter at or below the beam
+        rows = splitter_columns[col]
+        idx = bisect.bisect_left(rows, row)
 
-        while row < len(grid):
+        if idx == len(rows):
             if DEBUG:
-                char = grid[row][col] if col < len(grid[row]) else "?"
-                print(f"  Beam at ({row}, {col}): '{char}'")
+                print(f"\nBeam at ({row}, {col}) leaves the manifold")
+            continue
 
-            if grid[row][col] == SYMBOL_SPLITTER:
-                process_splitter(row, col, grid, state)
-                break
+        if DEBUG:
+            print(f"\nBeam at ({row}, {col}) falls to row {rows[idx]}")
 
-            row += 1
+        process_splitter(rows[idx], col, len(grid[rows[idx]]), state)
 
     return len(state.activated_splitters)
 
@@ -95,62 +144,93 @@ def solve_first(file_name: str) -> int:
     return simulate_beam(grid)
 
 
-def process_timeline_position(
-    col: int,
-    count: int,
-    grid_row: str,
-    new_timelines: dict,
-) -> None:
-    if col < len(grid_row) and grid_row[col] == SYMBOL_SPLITTER:
-        left_col = col - 1
-        right_col = col + 1
+def _count_timelines_sparse(start_col: int, splitter_rows: list[SplitterRow]) -> int:
+    timelines = {start_col: 1}
 
-        if left_col >= 0:
-            new_timelines[left_col] = new_timelines.get(left_col, 0) + count
-        if right_col < len(grid_row):
-            new_timelines[right_col] = new_timelines.get(right_col, 0) + count
+    for row_idx, cols, width in splitter_rows:
+        # Take every hit count first: a beam split sideways onto a
+        # neighbouring splitter in the same row doesn't split again
+        hits = [(col, timelines.pop(col)) for col in cols if col in timelines]
+        for col, count in hits:
+            if col > 0:
+                timelines[col - 1] = timelines.get(col - 1, 0) + count
+            if col + 1 < width:
+                timelines[col + 1] = timelines.get(col + 1, 0) + count
 
-        if DEBUG:
-            msg = (
-                f"  Position {col} ({count} timelines): splitter, "
-                f"creating {count} timelines at {left_col} and {count} at {right_col}"
+        if DEBUG and hits:
+            print(
+                f"Row {row_idx}: split {len(hits)} positions, timelines = {timelines}"
             )
-            print(msg)
-    else:
-        new_timelines[col] = new_timelines.get(col, 0) + count
-        if DEBUG:
-            print(f"  Position {col} ({count} timelines): continues")
 
+    return sum(timelines.values())
 
-def count_timelines(grid: list[str]) -> int:
-    start_row, start_col = find_start(grid)
-    if start_row == -1:
-        return 0
 
-    current_timelines = {start_col: 1}
+def _split_counts_list(counts: list[int], splitter_rows: list[SplitterRow]) -> None:
+    for _, cols, row_width in splitter_rows:
+        hits = [(col, counts[col]) for col in cols]
+        for col, _ in hits:
+            counts[col] = 0
+        for col, count in hits:
+            if col > 0:
+                counts[col - 1] += count
+            if col + 1 < row_width:
+                counts[col + 1] += count
 
-    if DEBUG:
-        print(f"Starting quantum particle at ({start_row}, {start_col})")
-        print(f"Initial timelines: {current_timelines}")
 
-    for row_idx in range(start_row, len(grid)):
-        if not current_timelines:
-            break
+def _count_timelines_array(
+    start_col: int, splitter_rows: list[SplitterRow], width: int
+) -> int:
+    # Spare last cell so a split off the right edge can be taken back out
+    counts = np.zeros(width + 1, dtype=np.uint64)
+    counts[start_col] = 1
+    mask = np.zeros(width + 1, dtype=bool)
 
-        if DEBUG:
-            print(f"\nRow {row_idx}: timelines = {current_timelines}")
+    # Each row at most doubles the total, so uint64 holds for 63 rows
+    for _, cols, row_width in splitter_rows[:UINT64_SAFE_ROWS]:
+        mask[cols] = True
+        moved = np.where(mask, counts, 0)
+        mask[cols] = False
+        counts -= moved
+        counts[:-1] += moved[1:]
+        counts[1:] += moved[:-1]
+        counts[row_width] -= moved[row_width - 1]
 
-        new_timelines = {}
+    # Past that, Python ints beat an object array
+    exact_counts = counts[:width].tolist()
+    _split_counts_list(exact_counts, splitter_rows[UINT64_SAFE_ROWS:])
 
-        for col, count in current_timelines.items():
-            process_timeline_position(col, count, grid[row_idx], new_timelines)
+    return sum(exact_counts)
 
-        current_timelines = new_timelines
 
-    total_timelines = sum(current_timelines.values())
+def count_timelines(grid: list[str], *, dense: bool = False) -> int:
+    """Number of timelines after the particle leaves the manifold.
+
+    Only rows holding splitters are visited. With dense=True counts live in
+    a per-column array (NumPy when available) updated by shifted adds.
+    """
+    start_row, start_col = find_start(grid)
+    if start_row == -1:
+        return 0
+
+    splitter_rows = find_splitter_rows(grid, start_row)
+
+    if DEBUG:
+        print(f"Starting quantum particle at ({start_row}, {start_col})")
+        print(f"{len(splitter_rows)} of {len(grid) - start_row} rows have splitters")
+
+    if not dense:
+        total_timelines = _count_timelines_sparse(start_col, splitter_rows)
+    else:
+        width = max(len(row) for row in grid)
+        if np is not None:
+            total_timelines = _count_timelines_array(start_col, splitter_rows, width)
+        else:
+            counts = [0] * width
+            counts[start_col] = 1
+            _split_counts_list(counts, splitter_rows)
+            total_timelines = sum(counts)
 
     if DEBUG:
-        print(f"\nFinal timeline distribution: {current_timelines}")
         print(f"Total timelines: {total_timelines}")
 
     return total_timelines
@@ -1,8 +1,23 @@
+from __future__ import annotations
+
+import heapq
+import itertools
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 DEBUG_LIMIT = 10  # Number of connections to show in debug output
+LEAF_SIZE = 8  # Most boxes in a KDTree leaf
+NODE_ENTRY, BOX_ENTRY = 0, 1  # Heap entry kinds; nodes first on equal distance
 
 
 def read_input(filename: str) -> list[str]:
@@ -24,16 +39,181 @@ def distance_squared(p1: tuple[int, int, int], p2: tuple[int, int, int]) -> int:
     return (p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2 + (p1[2] - p2[2]) ** 2
 
 
+class KDTree:
+    """Median-split k-d tree over junction boxes for nearest-first scans.
+
+    Splits follow the boxes themselves, so clusters and outliers only make
+    the tree a little deeper instead of piling boxes into one bucket.
+    """
+
+    def __init__(self, coords: list[tuple[int, int, int]]) -> None:
+        self.coords = coords
+        self.order = list(range(len(coords)))  # Leaves own slices of this
+        self.bounds: list[tuple[tuple[int, ...], tuple[int, ...]]] = []
+        self.children: list[tuple[int, int] | None] = []
+        self.slices: list[tuple[int, int]] = []
+        self._build(0, len(coords))
+
+    def _build(self, start: int, end: int) -> int:
+        # Recursion depth is only log2(n / LEAF_SIZE)
+        node = len(self.bounds)
+        points = [self.coords[idx] for idx in self.order[start:end]]
+        low = tuple(min(point[axis] for point in points) for axis in range(3))
+        high = tuple(max(point[axis] for point in points) for axis in range(3))
+        self.bounds.append((low, high))
+        self.children.append(None)
+        self.slices.append((start, end))
+
+        if end - start > LEAF_SIZE:
+            axis = max(range(3), key=lambda axis: high[axis] - low[axis])
+            self.order[start:end] = sorted(
+                self.order[start:end], key=lambda idx: self.coords[idx][axis]
+            )
+            middle = (start + end) // 2
+            self.children[node] = (self._build(start, middle), self._build(middle, end))
+
+        return node
+
+    def box_distance(self, point: tuple[int, int, int], node: int) -> int:
+        # Squared distance from point to the nearest spot in node's bounds
+        low, high = self.bounds[node]
+        total = 0
+        for axis in range(3):
+            if point[axis] < low[axis]:
+                total += (low[axis] - point[axis]) ** 2
+            elif point[axis] > high[axis]:
+                total += (point[axis] - high[axis]) ** 2
+
+        return total
+
+    def iter_neighbors(self, idx: int) -> Iterator[tuple[int, int]]:
+        """Yield (distance_squared, other) for every other box, nearest first.
+
+        Ties come out in index order: a node sorts before a box at the same
+        distance, so any box it holds is queued before that one is yielded.
+        """
+        point = self.coords[idx]
+        heap = [(0, NODE_ENTRY, 0)]
+        while heap:
+            dist_sq, kind, item = heapq.heappop(heap)
+            if kind == BOX_ENTRY:
+                yield dist_sq, item
+                continue
+
+            children = self.children[item]
+            if children is not None:
+                for child in children:
+                    entry = (self.box_distance(point, child), NODE_ENTRY, child)
+                    heapq.heappush(heap, entry)
+                continue
+
+            start, end = self.slices[item]
+            for other in self.order[start:end]:
+                if other != idx:
+                    dist_sq = distance_squared(point, self.coords[other])
+                    heapq.heappush(heap, (dist_sq, BOX_ENTRY, other))
+
+
+def iter_edges_by_distance(
+    coords: list[tuple[int, int, int]],
+) -> Iterator[tuple[int, int, int]]:
+    """Yield (distance_squared, i, j) with i < j in the order of a full sort.
+
+    Merges every box's nearest-first neighbour stream, so only edges that
+    are actually consumed get computed.
+    """
+    if not coords:
+        return
+
+    tree = KDTree(coords)
+    streams = [tree.iter_neighbors(idx) for idx in range(len(coords))]
+
+    heap = []
+    for i, stream in enumerate(streams):
+        first = next(stream, None)
+        if first is not None:
+            heap.append((first[0], i, first[1]))
+    heapq.heapify(heap)
+
+    while heap:
+        dist_sq, i, j = heap[0]
+        following = next(streams[i], None)
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (following[0], i, following[1]))
+
+        # Each pair comes from both endpoints' streams; keep one copy
+        if i < j:
+            yield dist_sq, i, j
+
+
+def _smallest_edges_array(
+    coords: list[tuple[int, int, int]], k: int
+) -> list[tuple[int, int, int]]:
+    # Condensed distance vector over i < j, partitioned around the k-th value.
+    # Everything tied with it is kept so the (i, j) tie-break matches a sort.
+    points = np.array(coords, dtype=np.int64)
+    first, second = np.triu_indices(len(coords), k=1)
+    diff = points[first] - points[second]
+    dists = (diff * diff).sum(axis=1)
+
+    if k < len(dists):
+        kth = np.partition(dists, k - 1)[k - 1]
+        keep = np.flatnonzero(dists <= kth)
+    else:
+        keep = np.arange(len(dists))
+
+    order = keep[np.lexsort((second[keep], first[keep], dists[keep]))[:k]]
+
+    return list(
+        zip(
+            dists[order].tolist(),
+            first[order].tolist(),
+            second[order].tolist(),
+            strict=True,
+        )
+    )
+
+
+def smallest_edges(
+    coords: list[tuple[int, int, int]], k: int
+) -> list[tuple[int, int, int]]:
+    """Return the k shortest (distance_squared, i, j) edges in sorted order.
+
+    Only the selected edges are ever ordered: NumPy partitions a condensed
+    distance vector when available, otherwise a bounded heap runs over pairs.
+    """
+    if k <= 0:
+        return []
+
+    if np is not None:
+        return _smallest_edges_array(coords, k)
+
+    n = len(coords)
+    pairs = (
+        (distance_squared(coords[i], coords[j]), i, j)
+        for i in range(n)
+        for j in range(i + 1, n)
+    )
+
+    return heapq.nsmallest(k, pairs)
+
+
 class UnionFind:
     def __init__(self, n: int) -> None:
         self.parent = list(range(n))
-        self.rank = [0] * n
+        self.size = [1] * n
+        self.num_components = n
 
     def find(self, x: int) -> int:
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
+        # Iterative with path halving, so long chains cannot hit recursion limits
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
 
-        return self.parent[x]
+        return x
 
     def union(self, x: int, y: int) -> bool:
         root_x = self.find(x)
@@ -42,46 +222,38 @@ class UnionFind:
         if root_x == root_y:
             return False
 
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-        else:
-            self.parent[root_y] = root_x
-            self.rank[root_x] += 1
+        # Union by size: hang the smaller tree under the larger one
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+
+        self.parent[root_y] = root_x
+        self.size[root_x] += self.size[root_y]
+        self.num_components -= 1
 
         return True
 
     def get_component_sizes(self) -> list[int]:
-        component_counts = {}
-        for i in range(len(self.parent)):
-            root = self.find(i)
-            component_counts[root] = component_counts.get(root, 0) + 1
-
-        return list(component_counts.values())
+        return [self.size[i] for i, parent in enumerate(self.parent) if parent == i]
 
 
-def solve_circuits(coords: list[tuple[int, int, int]], num_connections: int) -> int:
+def solve_circuits(
+    coords: list[tuple[int, int, int]], num_connections: int, *, top_k: bool = False
+) -> int:
     n = len(coords)
 
-    # Calculate all pairwise distances
-    edges = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist_sq = distance_squared(coords[i], coords[j])
-            edges.append((dist_sq, i, j))
-
-    edges.sort()
-
     if DEBUG:
         print(f"Total junction boxes: {n}")
-        print(f"Total possible connections: {len(edges)}")
+        print(f"Total possible connections: {n * (n - 1) // 2}")
         print(f"Making {num_connections} connections")
 
     # Use Union-Find to connect shortest edges
     uf = UnionFind(n)
+    if top_k:
+        edges = smallest_edges(coords, num_connections)
+    else:
+        edges = itertools.islice(iter_edges_by_distance(coords), num_connections)
 
-    for attempt_num, (_dist_sq, i, j) in enumerate(edges[:num_connections], 1):
+    for attempt_num, (_dist_sq, i, j) in enumerate(edges, 1):
         connected = uf.union(i, j)
 
         if DEBUG and attempt_num <= DEBUG_LIMIT:
@@ -108,32 +280,106 @@ def solve_first(file_name: str) -> int:
     return solve_circuits(coords, num_connections)
 
 
-def solve_all_connected(coords: list[tuple[int, int, int]]) -> int:
+def _mst_longest_edge_array(coords: list[tuple[int, int, int]]) -> tuple[int, int]:
+    n = len(coords)
+    points = np.array(coords, dtype=np.int64)
+    indices = np.arange(n)
+    unreached = np.iinfo(np.int64).max
+    best_dist = np.full(n, unreached, dtype=np.int64)
+    best_pair = np.full(n, unreached, dtype=np.int64)  # i * n + j with i < j
+    in_tree = np.zeros(n, dtype=bool)
+
+    longest = (-1, -1)
+    current = 0
+    for _ in range(n - 1):
+        in_tree[current] = True
+        diff = points - points[current]
+        dists = (diff * diff).sum(axis=1)
+        pairs = np.minimum(indices, current) * n + np.maximum(indices, current)
+
+        better = ~in_tree & (
+            (dists < best_dist) | ((dists == best_dist) & (pairs < best_pair))
+        )
+        best_dist[better] = dists[better]
+        best_pair[better] = pairs[better]
+
+        candidates = np.where(in_tree, unreached, best_dist)
+        ties = np.flatnonzero(candidates == candidates.min())
+        current = int(ties[np.argmin(best_pair[ties])])
+        longest = max(longest, (int(best_dist[current]), int(best_pair[current])))
+
+    return divmod(longest[1], n)
+
+
+def mst_longest_edge(coords: list[tuple[int, int, int]]) -> tuple[int, int] | None:
+    """Return (i, j) of the last edge Kruskal would add, via dense Prim's.
+
+    Edges are keyed by (distance_squared, i, j), so the tree is unique and
+    ties resolve exactly as in the sorted-edge loop. Uses O(n) memory.
+    """
+    n = len(coords)
+    if n < 2:  # noqa: PLR2004
+        return None
+
+    if np is not None:
+        return _mst_longest_edge_array(coords)
+
+    best: list[tuple[int, int, int] | None] = [None] * n
+    in_tree = [False] * n
+    longest = (-1, -1, -1)
+    current = 0
+
+    for _ in range(n - 1):
+        in_tree[current] = True
+        point = coords[current]
+        for other in range(n):
+            if in_tree[other]:
+                continue
+            i, j = min(current, other), max(current, other)
+            edge = (distance_squared(point, coords[other]), i, j)
+            if best[other] is None or edge < best[other]:
+                best[other] = edge
+
+        current = min(
+            (other for other in range(n) if not in_tree[other]),
+            key=best.__getitem__,
+        )
+        longest = max(longest, best[current])
+
+    return longest[1], longest[2]
+
+
+def solve_all_connected(
+    coords: list[tuple[int, int, int]], *, prim: bool = True
+) -> int:
     n = len(coords)
-
-    edges = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist_sq = distance_squared(coords[i], coords[j])
-            edges.append((dist_sq, i, j))
-
-    edges.sort()
 
     if DEBUG:
         print(f"Total junction boxes: {n}")
         print("Connecting until all in one circuit...")
 
+    if prim:
+        last_connected_pair = mst_longest_edge(coords)
+        if last_connected_pair is None:
+            return 0
+
+        i, j = last_connected_pair
+        if DEBUG:
+            print(f"Last connection: {coords[i]} - {coords[j]}")
+            print(f"X coordinates: {coords[i][0]} * {coords[j][0]}")
+
+        return coords[i][0] * coords[j][0]
+
     uf = UnionFind(n)
     last_connected_pair = None
     connections_made = 0
 
-    for _dist_sq, i, j in edges:
+    for _dist_sq, i, j in iter_edges_by_distance(coords):
         if uf.union(i, j):
             connections_made += 1
             last_connected_pair = (i, j)
 
-            num_components = len({uf.find(k) for k in range(n)})
-            if num_components == 1:
+            if uf.num_components == 1:
                 if DEBUG:
                     print(f"All connected after {connections_made} connections")
                     print(f"Last connection: {coords[i]} - {coords[j]}")
@@ -1,11 +1,29 @@
+from __future__ import annotations
+
+import bisect
+import itertools
 import os
+from array import array
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 
-OUTSIDE = "!"
-INSIDE = "."
-MARKER = "0"
+# Compressed grid cells, stored as bytes in one bytearray per row
+OUTSIDE = ord("!")
+INSIDE = ord(".")
+MARKER = ord("0")
+OUTSIDE_FLAGS = bytes(int(byte == OUTSIDE) for byte in range(256))
+
+Corners = tuple[tuple[int, int], tuple[int, int]] | None
 
 
 def read_input(filename: str) -> list[tuple[int, int]]:
@@ -43,20 +61,42 @@ def calculate_rectangle_area(
     return area
 
 
+def _staircase(
+    tiles: list[tuple[int, int]], x_sign: int, y_sign: int
+) -> list[tuple[int, int]]:
+    # Tiles not dominated towards the (x_sign, y_sign) corner: no other tile is
+    # at least as far out on both axes
+    frontier = []
+    best_y = None
+    for x, y in sorted(tiles, key=lambda t: (x_sign * t[0], y_sign * t[1])):
+        if best_y is None or y_sign * y < best_y:
+            best_y = y_sign * y
+            frontier.append((x, y))
+
+    return frontier
+
+
 def solve_first(file_name: str) -> int:
     tiles = read_input(file_name)
     max_area = 0
     best_corners = None
 
-    if DEBUG:
-        print("Checking all pairs of red tiles:\n")
+    # Moving a corner further out never shrinks the rectangle, so the best pair
+    # joins two opposite staircases: lower-left/upper-right or upper-left/lower-right
+    diagonals = (((1, 1), (-1, -1)), ((1, -1), (-1, 1)))
+    for first_corner, second_corner in diagonals:
+        first_side = _staircase(tiles, *first_corner)
+        second_side = _staircase(tiles, *second_corner)
 
-    for i in range(len(tiles)):
-        for j in range(i + 1, len(tiles)):
-            area = calculate_rectangle_area(tiles[i], tiles[j])
-            if area is not None and area > max_area:
-                max_area = area
-                best_corners = (tiles[i], tiles[j])
+        if DEBUG:
+            print(f"Staircases of {len(first_side)} and {len(second_side)} tiles")
+
+        for pos1 in first_side:
+            for pos2 in second_side:
+                area = calculate_rectangle_area(pos1, pos2)
+                if area is not None and area > max_area:
+                    max_area = area
+                    best_corners = (pos1, pos2)
 
     if DEBUG:
         if best_corners:
@@ -66,105 +106,135 @@ def solve_first(file_name: str) -> int:
     return max_area
 
 
-def get_line_tiles(
-    start: tuple[int, int], end: tuple[int, int]
-) -> set[tuple[int, int]]:
-    x1, y1 = start
-    x2, y2 = end
-    tiles = set()
-
-    # Horizontal or vertical line
-    if x1 == x2:
-        # Vertical line
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            tiles.add((x1, y))
-    elif y1 == y2:
-        # Horizontal line
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            tiles.add((x, y1))
-
-    return tiles
-
-
-def point_in_polygon(point: tuple[int, int], polygon: list[tuple[int, int]]) -> bool:
-    x, y = point
-    n = len(polygon)
-    inside = False
-
-    # Walk through each edge of the polygon
-    p1x, p1y = polygon[0]
-    for i in range(1, n + 1):
-        p2x, p2y = polygon[i % n]
-
-        # Check if the horizontal ray at height y could intersect this edge
-        # 1. Point's y must be within edge's y range (exclusive min, inclusive max)
-        # 2. Point must be to the left of (or on) the rightmost edge vertex
-        # 3. Edge must not be horizontal (p1y != p2y)
-        if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x) and p1y != p2y:
-            # Calculate x-coordinate where the ray intersects this edge
-            # Using linear interpolation: x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
-            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-
-            # If edge is vertical OR intersection is to the right of point, count it
-            if p1x == p2x or x <= xinters:
-                inside = not inside
-
-        # Move to next edge
-        p1x, p1y = p2x, p2y
+Intervals = tuple[list[int], list[int]]  # Sorted disjoint [start, end] x ranges
+
+
+def _merge_intervals(ranges: list[tuple[int, int]]) -> Intervals:
+    # Tiles are lattice points, so [a, b] and [b + 1, c] cover one unbroken run
+    starts: list[int] = []
+    ends: list[int] = []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+
+    return starts, ends
+
+
+def _intersect_intervals(first: Intervals, second: Intervals) -> Intervals:
+    starts: list[int] = []
+    ends: list[int] = []
+    i = j = 0
+    while i < len(first[0]) and j < len(second[0]):
+        start = max(first[0][i], second[0][j])
+        end = min(first[1][i], second[1][j])
+        if start <= end:
+            starts.append(start)
+            ends.append(end)
+        if first[1][i] < second[1][j]:
+            i += 1
+        else:
+            j += 1
+
+    return starts, ends
+
+
+def _covers(intervals: Intervals, x1: int, x2: int) -> bool:
+    idx = bisect.bisect_right(intervals[0], x1) - 1
+
+    return idx >= 0 and intervals[1][idx] >= x2
+
+
+class PolygonIndex:
+    """Tile containment for a rectilinear polygon in original coordinates.
+
+    Rows are grouped into bands (each vertex row, and each run of rows
+    between two vertex rows) sharing one sorted list of covered x ranges.
+    A segment tree over the bands stores the x ranges covered by every band
+    below each node. Boundary tiles count as inside.
+    """
+
+    def __init__(self, tiles: list[tuple[int, int]]) -> None:
+        vertical: dict[int, list[int]] = {}  # row where an edge starts -> x
+        ending: dict[int, list[int]] = {}  # row where an edge ends -> x
+        horizontal: dict[int, list[tuple[int, int]]] = {}
+        for (x1, y1), (x2, y2) in zip(tiles, tiles[1:] + tiles[:1], strict=True):
+            if x1 == x2:
+                vertical.setdefault(min(y1, y2), []).append(x1)
+                ending.setdefault(max(y1, y2), []).append(x1)
+            else:
+                horizontal.setdefault(y1, []).append((min(x1, x2), max(x1, x2)))
+
+        self.band_starts: list[int] = []
+        bands: list[Intervals] = []
+        active: list[int] = []  # x of vertical edges crossing the current slab
+        below: list[tuple[int, int]] = []
+        ys = sorted({y for _, y in tiles})
+        for k, y in enumerate(ys):
+            for x in ending.get(y, ()):
+                active.remove(x)
+            for x in vertical.get(y, ()):
+                bisect.insort(active, x)
+            # Crossing edges pair up left/right around the inside of the slab
+            above = list(zip(active[::2], active[1::2], strict=True))
+
+            self.band_starts.append(y)
+            bands.append(_merge_intervals(below + above + horizontal.get(y, [])))
+            if k + 1 < len(ys) and ys[k + 1] > y + 1:
+                self.band_starts.append(y + 1)
+                bands.append(_merge_intervals(above))
+            below = above
+
+        self.max_y = ys[-1] if ys else -1
+        self.bands = bands
+        self.size = 1
+        while self.size < len(bands):
+            self.size *= 2
+        # Leaves past the last band are None, meaning "no constraint"
+        self.tree: list[Intervals | None] = [None] * (2 * self.size)
+        self.tree[self.size : self.size + len(bands)] = bands
+        for node in range(self.size - 1, 0, -1):
+            left, right = self.tree[2 * node], self.tree[2 * node + 1]
+            if left is None or right is None:
+                self.tree[node] = left if right is None else right
+            else:
+                self.tree[node] = _intersect_intervals(left, right)
+
+    def _band_of(self, y: int) -> int:
+        return bisect.bisect_right(self.band_starts, y) - 1
+
+    def contains_point(self, pos: tuple[int, int]) -> bool:
+        x, y = pos
+        if not self.band_starts or not self.band_starts[0] <= y <= self.max_y:
+            return False
+
+        return _covers(self.bands[self._band_of(y)], x, x)
+
+    def contains_rectangle(self, pos1: tuple[int, int], pos2: tuple[int, int]) -> bool:
+        min_x, max_x = sorted((pos1[0], pos2[0]))
+        min_y, max_y = sorted((pos1[1], pos2[1]))
+        if not self.band_starts or min_y < self.band_starts[0] or max_y > self.max_y:
+            return False
+
+        # Standard bottom-up segment tree walk over bands [lo, hi)
+        lo = self._band_of(min_y) + self.size
+        hi = self._band_of(max_y) + self.size + 1
+        while lo < hi:
+            if lo & 1:
+                if not _covers(self.tree[lo], min_x, max_x):
+                    return False
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if not _covers(self.tree[hi], min_x, max_x):
+                    return False
+            lo //= 2
+            hi //= 2
 
-    return inside
-
-
-def build_edge_green_tiles(red_tiles: list[tuple[int, int]]) -> set[tuple[int, int]]:
-    green_tiles = set()
-
-    for i in range(len(red_tiles)):
-        start = red_tiles[i]
-        end = red_tiles[(i + 1) % len(red_tiles)]  # Wrap to first tile
-        line_tiles = get_line_tiles(start, end)
-        green_tiles.update(line_tiles)
-
-    # Remove red tiles from green (they're on the edges but should stay red)
-    green_tiles -= set(red_tiles)
-
-    if DEBUG:
-        print(f"Built {len(green_tiles)} edge green tiles")
-
-    return green_tiles
-
-
-def is_tile_valid(
-    pos: tuple[int, int],
-    red_tiles: set[tuple[int, int]],
-    edge_green_tiles: set[tuple[int, int]],
-    red_tiles_list: list[tuple[int, int]],
-) -> bool:
-    if pos in red_tiles or pos in edge_green_tiles:
         return True
 
-    return point_in_polygon(pos, red_tiles_list)
-
-
-def is_valid_rectangle(
-    pos1: tuple[int, int],
-    pos2: tuple[int, int],
-    red_tiles: set[tuple[int, int]],
-    edge_green_tiles: set[tuple[int, int]],
-    red_tiles_list: list[tuple[int, int]],
-) -> bool:
-    x1, y1 = pos1
-    x2, y2 = pos2
-
-    min_x, max_x = min(x1, x2), max(x1, x2)
-    min_y, max_y = min(y1, y2), max(y1, y2)
-
-    for x in range(min_x, max_x + 1):
-        for y in range(min_y, max_y + 1):
-            if not is_tile_valid((x, y), red_tiles, edge_green_tiles, red_tiles_list):
-                return False
-
-    return True
-
 
 def compress_coordinates(
     tiles: list[tuple[int, int]],
@@ -185,22 +255,42 @@ def compress_coordinates(
     return compressed, x_map, y_map
 
 
+def _next_boundary(row: bytearray, start: int, end: int) -> int:
+    # First non-INSIDE cell in row[start:end], or end if the run reaches it
+    hits = [
+        i
+        for i in (row.find(MARKER, start, end), row.find(OUTSIDE, start, end))
+        if i >= 0
+    ]
+
+    return min(hits, default=end)
+
+
 def flood_fill_exterior(
-    grid: list[list[str]], start_x: int, start_y: int, width: int, height: int
+    grid: list[bytearray], start_x: int, start_y: int, width: int, height: int
 ) -> None:
+    # Span fill: each seed floods its whole horizontal run of INSIDE cells at
+    # once, then seeds one cell per INSIDE run in the rows above and below
     stack = [(start_x, start_y)]
 
     while stack:
         x, y = stack.pop()
-        if x < 0 or x >= width or y < 0 or y >= height:
-            continue
-        if grid[y][x] != INSIDE:
+        row = grid[y]
+        if row[x] != INSIDE:
             continue
 
-        grid[y][x] = OUTSIDE
+        left = max(row.rfind(MARKER, 0, x), row.rfind(OUTSIDE, 0, x)) + 1
+        right = _next_boundary(row, x, width)
+        row[left:right] = bytes([OUTSIDE]) * (right - left)
 
-        # Add neighbors
-        stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+        for next_y in (y - 1, y + 1):
+            if not 0 <= next_y < height:
+                continue
+            next_row = grid[next_y]
+            pos = next_row.find(INSIDE, left, right)
+            while pos >= 0:
+                stack.append((pos, next_y))
+                pos = next_row.find(INSIDE, _next_boundary(next_row, pos, right), right)
 
 
 def build_compressed_grid(
@@ -208,8 +298,8 @@ def build_compressed_grid(
     width: int,
     height: int,
     padding: int,
-) -> list[list[str]]:
-    grid = [[INSIDE for _ in range(width)] for _ in range(height)]
+) -> list[bytearray]:
+    grid = [bytearray([INSIDE]) * width for _ in range(height)]
 
     # Mark polygon edges (with offset for padding)
     for i in range(len(compressed_tiles)):
@@ -219,36 +309,128 @@ def build_compressed_grid(
         min_cx, max_cx = min(cx1, cx2) + padding, max(cx1, cx2) + padding
         min_cy, max_cy = min(cy1, cy2) + padding, max(cy1, cy2) + padding
 
-        for x in range(min_cx, max_cx + 1):
-            for y in range(min_cy, max_cy + 1):
-                grid[y][x] = MARKER
+        if min_cx == max_cx:
+            for row in grid[min_cy : max_cy + 1]:
+                row[min_cx] = MARKER
+        else:
+            for row in grid[min_cy : max_cy + 1]:
+                row[min_cx : max_cx + 1] = bytes([MARKER]) * (max_cx - min_cx + 1)
 
     return grid
 
 
-def is_rectangle_valid_compressed(
-    grid: list[list[str]],
+def build_outside_prefix_sums(grid: list[bytearray]) -> list[array]:
+    """Summed-area table: prefix[y][x] counts OUTSIDE cells above-left of (x, y)."""
+    width = len(grid[0])
+    # Counts never exceed the cell count, so 4-byte unsigned entries suffice
+    prefix = [array("I", [0]) * (width + 1)]
+    for row in grid:
+        # Per-row running count, added column-wise onto the row above
+        running = itertools.accumulate(row.translate(OUTSIDE_FLAGS), initial=0)
+        above = prefix[-1]
+        prefix.append(array("I", [a + b for a, b in zip(above, running, strict=True)]))
+
+    return prefix
+
+
+def is_rectangle_valid_prefix(
+    prefix: list[array],
     corner1: tuple[int, int],
     corner2: tuple[int, int],
     padding: int,
 ) -> bool:
-    """Check if rectangle contains any exterior markers in compressed space."""
+    """Check in O(1) that a compressed rectangle has no exterior cells."""
     cx1, cy1 = corner1
     cx2, cy2 = corner2
     min_cx = min(cx1, cx2) + padding
-    max_cx = max(cx1, cx2) + padding
+    max_cx = max(cx1, cx2) + padding + 1
     min_cy = min(cy1, cy2) + padding
-    max_cy = max(cy1, cy2) + padding
+    max_cy = max(cy1, cy2) + padding + 1
+
+    outside = (
+        prefix[max_cy][max_cx]
+        - prefix[min_cy][max_cx]
+        - prefix[max_cy][min_cx]
+        + prefix[min_cy][min_cx]
+    )
+
+    return outside == 0
+
+
+def iter_pairs_by_area(tiles: list[tuple[int, int]]) -> Iterator[tuple[int, int, int]]:
+    """Yield (area, i, j) for every non-degenerate tile pair, largest first."""
+    n = len(tiles)
+    if np is not None:
+        xs, ys = np.array(tiles, dtype=np.int64).reshape(-1, 2).T
+        first, second = np.triu_indices(n, k=1)
+        dx = np.abs(xs[first] - xs[second])
+        dy = np.abs(ys[first] - ys[second])
+        keep = (dx != 0) & (dy != 0)
+        areas = ((dx + 1) * (dy + 1))[keep]
+        order = np.argsort(-areas, kind="stable")
+        yield from zip(
+            areas[order].tolist(),
+            first[keep][order].tolist(),
+            second[keep][order].tolist(),
+            strict=True,
+        )
+        return
+
+    pairs = []
+    for i, (x1, y1) in enumerate(tiles):
+        for j in range(i + 1, n):
+            x2, y2 = tiles[j]
+            if x1 != x2 and y1 != y2:
+                pairs.append(((abs(x2 - x1) + 1) * (abs(y2 - y1) + 1), i, j))
+    pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+    yield from pairs
+
+
+def _largest_valid_in_order(
+    tiles: list[tuple[int, int]],
+    compressed_tiles: list[tuple[int, int, int, int]],
+    prefix: list[array],
+    padding: int,
+) -> tuple[int, Corners]:
+    max_area = 0
+    best_corners = None
 
-    for x in range(min_cx, max_cx + 1):
-        for y in range(min_cy, max_cy + 1):
-            if grid[y][x] == OUTSIDE:
-                return False
+    for i in range(len(tiles)):
+        for j in range(i + 1, len(tiles)):
+            area = calculate_rectangle_area(tiles[i], tiles[j])
+            if area is None or area <= max_area:
+                continue
 
-    return True
+            _, _, cx1, cy1 = compressed_tiles[i]
+            _, _, cx2, cy2 = compressed_tiles[j]
 
+            if is_rectangle_valid_prefix(prefix, (cx1, cy1), (cx2, cy2), padding):
+                max_area = area
+                best_corners = (tiles[i], tiles[j])
+                if DEBUG:
+                    print(f"  Valid rectangle: {tiles[i]} to {tiles[j]} = {area}")
+
+    return max_area, best_corners
 
-def solve_second(file_name: str) -> int:
+
+def _largest_valid_by_area(
+    tiles: list[tuple[int, int]],
+    compressed_tiles: list[tuple[int, int, int, int]],
+    prefix: list[array],
+    padding: int,
+) -> tuple[int, Corners]:
+    # Largest candidates first: the first valid one is the answer
+    for area, i, j in iter_pairs_by_area(tiles):
+        _, _, cx1, cy1 = compressed_tiles[i]
+        _, _, cx2, cy2 = compressed_tiles[j]
+        if is_rectangle_valid_prefix(prefix, (cx1, cy1), (cx2, cy2), padding):
+            return area, (tiles[i], tiles[j])
+
+    return 0, None
+
+
+def solve_second(file_name: str, *, by_area: bool = True) -> int:
     tiles = read_input(file_name)
 
     compressed_tiles, x_map, y_map = compress_coordinates(tiles)
@@ -261,27 +443,13 @@ def solve_second(file_name: str) -> int:
     grid = build_compressed_grid(compressed_tiles, width, height, padding)
     flood_fill_exterior(grid, 0, 0, width, height)
 
-    if DEBUG:
-        exterior_count = sum(row.count(OUTSIDE) for row in grid)
-        print(f"Marked {exterior_count} exterior tiles\n")
-
-    max_area = 0
-    best_corners = None
-
-    for i in range(len(tiles)):
-        for j in range(i + 1, len(tiles)):
-            area = calculate_rectangle_area(tiles[i], tiles[j])
-            if area is None or area <= max_area:
-                continue
+    prefix = build_outside_prefix_sums(grid)
 
-            _, _, cx1, cy1 = compressed_tiles[i]
-            _, _, cx2, cy2 = compressed_tiles[j]
+    if DEBUG:
+        print(f"Marked {prefix[height][width]} exterior tiles\n")
 
-            if is_rectangle_valid_compressed(grid, (cx1, cy1), (cx2, cy2), padding):
-                max_area = area
-                best_corners = (tiles[i], tiles[j])
-                if DEBUG:
-                    print(f"  Valid rectangle: {tiles[i]} to {tiles[j]} = {area}")
+    search = _largest_valid_by_area if by_area else _largest_valid_in_order
+    max_area, best_corners = search(tiles, compressed_tiles, prefix, padding)
 
     if DEBUG:
         if best_corners:
@@ -1,4 +1,9 @@
+from src.day_10 import read_input
 from src.day_10 import solve_first
+from src.day_10 import solve_joltage
+from src.day_10 import solve_joltage_machines
+from src.day_10 import solve_lights_gf2
+from src.day_10 import solve_lights_machines
 from src.day_10 import solve_second
 
 
@@ -30,3 +35,44 @@ def test_solve_second() -> None:
     assert result != 21010
     assert result != 21013
     assert result == 21021
+
+
+def test_solve_lights_gf2_matches_brute_force() -> None:
+    for target, buttons, _joltages in read_input("input/day_10.txt")[:40]:
+        num_buttons = len(buttons)
+        best = float("inf")
+        for mask in range(1 << num_buttons):
+            lights = [0] * len(target)
+            for button_idx in range(num_buttons):
+                if (mask >> button_idx) & 1:
+                    for light_idx in buttons[button_idx]:
+                        lights[light_idx] ^= 1
+            if lights == target:
+                best = min(best, mask.bit_count())
+
+        assert solve_lights_gf2(target, buttons) == best
+
+
+def test_solve_joltage_exact_per_machine() -> None:
+    machines = read_input("input/day_10_example.txt")
+    presses = [solve_joltage(joltages, buttons) for _, buttons, joltages in machines]
+    assert presses == [10, 12, 11]
+
+    # Unreachable: the only button always raises both counters together
+    assert solve_joltage([1, 2], [[0, 1]]) == float("inf")
+
+
+def test_float_search_matches_exact() -> None:
+    for _target, buttons, joltages in read_input("input/day_10.txt")[:60]:
+        assert solve_joltage(joltages, buttons, exact=False) == solve_joltage(
+            joltages, buttons
+        )
+
+
+def test_parallel_machines_match_sequential() -> None:
+    machines = read_input("input/day_10.txt")[:30]
+
+    assert solve_lights_machines(machines, workers=2) == solve_lights_machines(machines)
+    assert solve_joltage_machines(machines, workers=2) == solve_joltage_machines(
+        machines
+    )
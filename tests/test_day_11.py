@@ -1,3 +1,12 @@
+import itertools
+
+import pytest
+
+from src.day_11 import CompiledGraph
+from src.day_11 import PathCounter
+from src.day_11 import count_paths
+from src.day_11 import count_paths_through
+from src.day_11 import read_input
 from src.day_11 import solve_first
 from src.day_11 import solve_second
 
@@ -20,3 +29,93 @@ def test_solve_second_example() -> None:
 def test_solve_second() -> None:
     result = solve_second("input/day_11.txt")
     assert result == 517315308154944
+
+
+def test_count_paths_through_matches_enumeration() -> None:
+    graph = read_input("input/day_11_example_part2.txt")
+    devices = sorted(set(graph).union(*graph.values()))
+
+    paths = []
+    stack = [["svr"]]
+    while stack:
+        path = stack.pop()
+        if path[-1] == "out":
+            paths.append(set(path))
+        else:
+            stack.extend([*path, output] for output in graph.get(path[-1], ()))
+
+    compiled = CompiledGraph(graph)
+    for k in range(4):
+        for waypoints in itertools.combinations(devices, k):
+            expected = sum(1 for path in paths if path.issuperset(waypoints))
+            assert (
+                count_paths_through(compiled, "svr", "out", list(waypoints)) == expected
+            )
+
+
+def test_count_paths_through_waypoint_limit() -> None:
+    chain = [f"n{idx}" for idx in range(17)]
+    graph = {node: [output] for node, output in itertools.pairwise(chain)}
+    graph[chain[-1]] = ["out"]
+    compiled = CompiledGraph(graph)
+
+    assert compiled.in_degree.tolist() == [0] + [1] * 17
+    assert compiled.out_degree.tolist() == [1] * 17 + [0]
+    assert compiled.topological_order.tolist() == list(range(18))
+    assert count_paths_through(compiled, "n0", "out", chain[1:]) == 1
+    with pytest.raises(ValueError, match="At most 16"):
+        count_paths_through(compiled, "n0", "out", chain)
+
+
+def test_count_paths_deep_chain_and_cycles() -> None:
+    chain = {f"n{idx}": [f"n{idx + 1}"] for idx in range(100_000)}
+    assert count_paths(CompiledGraph(chain), "n0", "n100000") == 1
+
+    looped = {"svr": ["aaa"], "aaa": ["bbb", "out"], "bbb": ["ccc"], "ccc": ["aaa"]}
+    with pytest.raises(ValueError, match="cycle: aaa -> bbb -> ccc -> aaa"):
+        count_paths(CompiledGraph(looped), "svr", "out")
+    with pytest.raises(ValueError, match="cycle: aaa -> bbb -> ccc -> aaa"):
+        count_paths_through(CompiledGraph(looped), "svr", "out", ["aaa"])
+    with pytest.raises(ValueError, match="cycle: aaa -> bbb -> ccc -> aaa"):
+        PathCounter(CompiledGraph(looped)).count("svr", "out")
+
+
+def test_cycles_off_the_path_are_ignored() -> None:
+    # Unreachable from the start, after the target, and a dead end
+    unreachable = CompiledGraph({"you": ["out"], "x": ["y"], "y": ["x"]})
+    assert count_paths(unreachable, "you", "out") == 1
+
+    past_end = CompiledGraph(
+        {
+            "svr": ["dac", "loop"],
+            "dac": ["fft"],
+            "fft": ["out"],
+            "out": ["z"],
+            "z": ["out"],
+            "loop": ["loop"],
+        }
+    )
+    assert count_paths_through(past_end, "svr", "out", ["dac", "fft"]) == 1
+    assert PathCounter(past_end).count("svr", "out", via=["fft", "dac"]) == 1
+    assert PathCounter(unreachable).count("you", "out") == 1
+
+
+def test_path_counter_queries() -> None:
+    counter = PathCounter.from_file("input/day_11.txt", cache_size=2)
+
+    assert counter.count("you", "out") == 523
+    assert counter.count("svr", "out", via=["fft", "dac"]) == 517315308154944
+    assert counter.count("svr", "out", via=["dac", "fft", "dac"]) == 517315308154944
+    assert counter.count("svr", "out", via=["missing"]) == 0
+    assert counter.count("out", "out") == 1
+
+    graph = counter.graph
+    for via in (["dac"], ["fft"], ["dac", "fft", "you"]):
+        expected = count_paths_through(graph, "svr", "out", via)
+        assert counter.count("svr", "out", via=via) == expected
+
+    # Only the two most recent targets are kept
+    assert counter.paths_to.cache_info().currsize == 2
+    misses = counter.paths_to.cache_info().misses
+    assert counter.count("you", "out") == 523
+    assert counter.paths_to.cache_info().misses == misses
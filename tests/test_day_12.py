@@ -1,4 +1,7 @@
+from src.day_12 import get_orientations
+from src.day_12 import placement_masks
 from src.day_12 import solve_first
+from src.day_12 import solve_region
 
 
 def test_solve_first_example() -> None:
@@ -11,3 +14,16 @@ def test_solve_first() -> None:
     result = solve_first("input/day_12.txt")
     print(f"Day 12 Part 1 answer: {result}")
     assert result == 555
+
+
+def test_bitboard_placements() -> None:
+    corner = {(0, 0), (0, 1), (1, 0)}
+    orientations = get_orientations(corner)
+    masks = placement_masks(orientations, 3, 2)
+
+    # Four orientations, two in-bounds anchors each, none wrapping a row
+    assert len(orientations) == 4
+    assert len(masks) == 8
+    assert all(mask.bit_count() == 3 and mask < 1 << 6 for mask in masks)
+    assert solve_region(3, 2, [(0, orientations)] * 2)
+    assert not solve_region(3, 2, [(0, orientations)] * 3)
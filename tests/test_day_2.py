@@ -1,5 +1,9 @@
+from src.day_2 import is_invalid_id
+from src.day_2 import is_invalid_id_v2
+from src.day_2 import iter_invalid_ids
 from src.day_2 import solve_first
 from src.day_2 import solve_second
+from src.day_2 import sum_invalid_ids
 
 
 def test_solve_first_example() -> None:
@@ -24,3 +28,26 @@ def test_solve_second() -> None:
     result = solve_second("input/day_2.txt")
     print(f"Day 2 Part 2 answer: {result}")
     assert result == 50857215650
+
+
+def test_invalid_ids_match_brute_force() -> None:
+    for any_repeats, is_invalid in ((False, is_invalid_id), (True, is_invalid_id_v2)):
+        for start, end in ((1, 20000), (95, 115), (998, 1012), (1111, 1111)):
+            expected = [n for n in range(start, end + 1) if is_invalid(n)]
+            found = list(iter_invalid_ids(start, end, any_repeats=any_repeats))
+            assert found == expected
+            assert sum_invalid_ids(start, end, any_repeats=any_repeats) == sum(expected)
+
+
+def test_sum_invalid_ids_huge_range() -> None:
+    # Every half-pattern of every even length, summed per length in closed form
+    expected = 0
+    for half in range(1, 10):
+        low, high = 10 ** (half - 1), 10**half - 1
+        expected += (10**half + 1) * (low + high) * (high - low + 1) // 2
+    assert sum_invalid_ids(1, 10**18) == expected
+
+    start, end = 1, 10**10
+    assert sum_invalid_ids(start, end, any_repeats=True) == sum(
+        iter_invalid_ids(start, end, any_repeats=True)
+    )
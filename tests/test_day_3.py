@@ -1,5 +1,20 @@
+import io
+import itertools
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from src import day_3
+from src.day_3 import bank_joltage
+from src.day_3 import find_max_joltage
+from src.day_3 import find_max_joltage_n_batteries
+from src.day_3 import iter_banks
+from src.day_3 import select_max_positions
 from src.day_3 import solve_first
 from src.day_3 import solve_second
+from src.day_3 import total_joltage
 
 
 def test_solve_first_example() -> None:
@@ -24,3 +39,62 @@ def test_solve_second() -> None:
     result = solve_second("input/day_3.txt")
     print(f"Day 3 Part 2 answer: {result}")
     assert result == 170371185255900
+
+
+def test_select_max_positions_matches_window_scan() -> None:
+    banks = (
+        "".join(digits)
+        for length in range(1, 7)
+        for digits in itertools.product("129", repeat=length)
+    )
+    for bank in banks:
+        for n in range(1, len(bank) + 1):
+            # Reference: best digit in each feasible window, leftmost on ties
+            expected = []
+            start = 0
+            for remaining in range(n - 1, -1, -1):
+                window = bank[start : len(bank) - remaining]
+                start += window.index(max(window))
+                expected.append(start)
+                start += 1
+
+            assert select_max_positions(bank, n) == expected
+            assert select_max_positions(bank.encode(), n) == expected
+
+
+def test_find_max_joltage_large_bank() -> None:
+    bank = "12" * 50_000 + "9" * 1000
+    assert find_max_joltage(bank) == 99
+    assert select_max_positions(bank, 1000) == list(range(100_000, 101_000))
+    assert find_max_joltage_n_batteries(bank, 1001) == int("2" + "9" * 1000)
+
+    # Past Python's 4300-digit int() limit
+    bank = "12" * 50_000 + "9" * 10_000
+    expected = 3 * 10**10_000 - 1  # 2 followed by ten thousand 9s
+    assert find_max_joltage_n_batteries(bank, 10_001) == expected
+    assert bank_joltage(bank.encode(), 10_001) == expected
+    assert 10**4999 < bank_joltage("123456789" * 1000, 5000) < 10**5000
+
+
+def test_total_joltage_streams() -> None:
+    stream = io.BytesIO(b"987654321111111\n\n811111111111119\r\n")
+    assert list(iter_banks(stream)) == [b"987654321111111", b"811111111111119"]
+
+    banks = iter_banks("input/day_3.txt")
+    assert total_joltage(banks, 12, workers=2, chunk_size=16) == 170371185255900
+
+
+def test_short_banks_raise_unless_skipped() -> None:
+    with pytest.raises(ValueError, match="Cannot select 2 batteries"):
+        bank_joltage(b"7", 2)
+    assert bank_joltage(b"7", 2, skip_short=True) == 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dump = Path(tmp_dir) / "banks.txt"
+        dump.write_text("7\n98\n1234567\n")
+        for debug in (False, True):
+            with mock.patch.object(day_3, "DEBUG", debug):
+                assert solve_first(str(dump)) == 98 + 67
+                with pytest.raises(ValueError, match="Cannot select 12 batteries"):
+                    solve_second(str(dump))
+                assert solve_second(str(dump), skip_short=True) == 0
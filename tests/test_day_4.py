@@ -1,3 +1,9 @@
+from unittest import mock
+
+from src import day_4
+from src.day_4 import find_accessible_rolls_mutable
+from src.day_4 import iter_removal_waves
+from src.day_4 import read_input
 from src.day_4 import solve_first
 from src.day_4 import solve_second
 
@@ -24,3 +30,21 @@ def test_solve_second() -> None:
     result = solve_second("input/day_4.txt")
     print(f"Day 4 Part 2 answer: {result}")
     assert result == 8310
+
+
+def test_removal_waves_match_full_rescan() -> None:
+    lines = read_input("input/day_4_example.txt")
+    grid = [list(line) for line in lines]
+    expected = []
+    while to_remove := find_accessible_rolls_mutable(grid, len(grid), len(grid[0])):
+        expected.append(sorted(to_remove))
+        for row, col in to_remove:
+            grid[row][col] = "."
+
+    assert [sorted(wave) for wave in iter_removal_waves(lines)] == expected
+
+
+def test_pure_python_fallback() -> None:
+    with mock.patch.object(day_4, "np", None):
+        assert solve_first("input/day_4.txt") == 1457
+        assert solve_second("input/day_4.txt") == 8310
@@ -1,3 +1,5 @@
+from src.day_5 import RangeIndex
+from src.day_5 import is_fresh
 from src.day_5 import solve_first
 from src.day_5 import solve_second
 
@@ -24,3 +26,14 @@ def test_solve_second() -> None:
     result = solve_second("input/day_5.txt")
     print(f"Day 5 Part 2 answer: {result}")
     assert result == 332067203034711
+
+
+def test_range_index_matches_linear_scan() -> None:
+    ranges = [(3, 5), (10, 14), (16, 20), (12, 18), (25, 25)]
+    ids = [*range(30), 12, 12, 25]
+    index = RangeIndex(ranges)
+
+    for ingredient_id in ids:
+        assert (ingredient_id in index) == is_fresh(ingredient_id, ranges)
+    assert index.count_fresh(ids) == sum(is_fresh(i, ranges) for i in ids)
+    assert RangeIndex([]).count_fresh(ids) == 0
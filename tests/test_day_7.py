@@ -1,3 +1,9 @@
+from unittest import mock
+
+from src import day_7
+from src.day_7 import count_timelines
+from src.day_7 import read_input
+from src.day_7 import simulate_beam
 from src.day_7 import solve_first
 from src.day_7 import solve_second
 
@@ -24,3 +30,30 @@ def test_solve_second() -> None:
     result = solve_second("input/day_7.txt")
     print(f"Day 7 Part 2 answer: {result}")
     assert result == 10357305916520
+
+
+def test_timeline_backends_agree_on_tall_grid() -> None:
+    # Ragged rows, adjacent splitters and splitters on both edges
+    rows = ["." * 30 + "S" + "." * 30]
+    for row_idx in range(2000):
+        if row_idx % 7 == 0:
+            rows.append(
+                "".join("^" if col % 4 == row_idx % 4 else "." for col in range(61))
+            )
+        elif row_idx % 7 == 3:
+            rows.append("^" + "." * 50 + "^^")
+        else:
+            rows.append("." * 61)
+
+    expected = count_timelines(rows)
+    assert expected > 2**64
+    assert count_timelines(rows, dense=True) == expected
+    assert count_timelines(read_input("input/day_7.txt"), dense=True) == 10357305916520
+    with mock.patch.object(day_7, "np", None):
+        assert count_timelines(rows, dense=True) == expected
+
+
+def test_simulate_beam_tall_sparse_grid() -> None:
+    grid = ["....S...."] + ["........."] * 100_000
+    grid += ["....^....", ".........", "...^.^...", "..^...^..", "........."]
+    assert simulate_beam(grid) == 5
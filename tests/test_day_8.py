@@ -1,3 +1,15 @@
+import itertools
+from unittest import mock
+
+from src import day_8
+from src.day_8 import UnionFind
+from src.day_8 import distance_squared
+from src.day_8 import iter_edges_by_distance
+from src.day_8 import parse_coordinates
+from src.day_8 import read_input
+from src.day_8 import smallest_edges
+from src.day_8 import solve_all_connected
+from src.day_8 import solve_circuits
 from src.day_8 import solve_first
 from src.day_8 import solve_second
 
@@ -24,3 +36,64 @@ def test_solve_second() -> None:
     result = solve_second("input/day_8.txt")
     print(f"Day 8 Part 2 answer: {result}")
     assert result == 2573952864
+
+
+def test_edge_stream_matches_full_sort() -> None:
+    coords = parse_coordinates(read_input("input/day_8_example.txt"))
+    n = len(coords)
+    edges = sorted(
+        (distance_squared(coords[i], coords[j]), i, j)
+        for i in range(n)
+        for j in range(i + 1, n)
+    )
+
+    assert list(iter_edges_by_distance(coords)) == edges
+
+
+def test_top_k_edges() -> None:
+    coords = parse_coordinates(read_input("input/day_8.txt"))
+
+    assert solve_circuits(coords, 1000, top_k=True) == 112230
+    assert smallest_edges(coords, 50) == list(
+        itertools.islice(iter_edges_by_distance(coords), 50)
+    )
+
+
+def test_union_find_tracks_components() -> None:
+    n = 100_000
+    uf = UnionFind(n)
+    for i in range(1, n // 2):
+        assert uf.union(i - 1, i)
+    assert not uf.union(0, n // 2 - 1)
+
+    assert uf.num_components == n - (n // 2 - 1)
+    assert sorted(uf.get_component_sizes(), reverse=True)[:2] == [n // 2, 1]
+    assert uf.find(n // 2 - 1) == uf.find(0)
+
+
+def test_prim_matches_kruskal() -> None:
+    coords = parse_coordinates(read_input("input/day_8.txt"))
+
+    assert solve_all_connected(coords, prim=False) == 2573952864
+    with mock.patch.object(day_8, "np", None):
+        assert solve_all_connected(coords, prim=True) == 2573952864
+
+
+def test_skewed_boxes_keep_full_sort_order() -> None:
+    # Two separated clusters, duplicate boxes and one far outlier
+    cube = [
+        (idx * 7919 % 1000, idx * 104729 % 1000, idx * 1299709 % 1000)
+        for idx in range(150)
+    ]
+    coords = cube + [(x + 10**5, y, z) for x, y, z in cube] + cube[:10]
+    coords.append((10**7, 10**7, 10**7))
+
+    edges = [
+        (distance_squared(coords[i], coords[j]), i, j)
+        for i, j in itertools.combinations(range(len(coords)), 2)
+    ]
+    edges.sort()
+    assert list(iter_edges_by_distance(coords)) == edges
+    assert solve_all_connected(coords, prim=True) == solve_all_connected(
+        coords, prim=False
+    )
@@ -1,3 +1,15 @@
+from unittest import mock
+
+from src import day_9
+from src.day_9 import OUTSIDE
+from src.day_9 import PolygonIndex
+from src.day_9 import build_compressed_grid
+from src.day_9 import build_outside_prefix_sums
+from src.day_9 import compress_coordinates
+from src.day_9 import flood_fill_exterior
+from src.day_9 import is_rectangle_valid_prefix
+from src.day_9 import iter_pairs_by_area
+from src.day_9 import read_input
 from src.day_9 import solve_first
 from src.day_9 import solve_second
 
@@ -23,3 +35,57 @@ def test_solve_second() -> None:
     result = solve_second("input/day_9.txt")
     print(f"Day 9 Part 2 answer: {result}")
     assert result == 1560475800
+
+
+def test_prefix_check_matches_cell_scan() -> None:
+    tiles = read_input("input/day_9_example.txt")
+    compressed, x_map, y_map = compress_coordinates(tiles)
+    width, height = len(x_map) + 2, len(y_map) + 2
+    grid = build_compressed_grid(compressed, width, height, 1)
+    flood_fill_exterior(grid, 0, 0, width, height)
+    prefix = build_outside_prefix_sums(grid)
+
+    for _, _, cx1, cy1 in compressed:
+        for _, _, cx2, cy2 in compressed:
+            xs = range(min(cx1, cx2) + 1, max(cx1, cx2) + 2)
+            ys = range(min(cy1, cy2) + 1, max(cy1, cy2) + 2)
+            expected = all(grid[y][x] != OUTSIDE for x in xs for y in ys)
+            corners = ((cx1, cy1), (cx2, cy2))
+            assert is_rectangle_valid_prefix(prefix, *corners, 1) == expected
+
+
+def test_candidate_orders_agree() -> None:
+    assert solve_second("input/day_9.txt", by_area=False) == 1560475800
+    with mock.patch.object(day_9, "np", None):
+        assert solve_second("input/day_9.txt") == 1560475800
+
+
+def test_polygon_index_queries() -> None:
+    index = PolygonIndex(read_input("input/day_9_example.txt"))
+
+    assert index.contains_point((7, 1))  # Red corner
+    assert index.contains_point((9, 1))  # Green edge
+    assert index.contains_point((8, 4))  # Interior
+    assert not index.contains_point((3, 2))
+    assert not index.contains_point((11, 8))
+    assert index.contains_rectangle((9, 5), (2, 3))
+    assert not index.contains_rectangle((9, 7), (2, 3))
+
+    # The notch's single interior column has no vertex of its own
+    notched = [(0, 0), (6, 0), (6, 3), (5, 3), (5, 1), (3, 1), (3, 3), (0, 3)]
+    index = PolygonIndex(notched)
+    assert index.contains_point((4, 1))
+    assert not index.contains_point((4, 2))
+    assert not index.contains_rectangle((0, 2), (6, 3))
+    assert index.contains_rectangle((0, 0), (6, 1))
+
+
+def test_polygon_index_largest_rectangle() -> None:
+    tiles = read_input("input/day_9.txt")
+    index = PolygonIndex(tiles)
+    area = next(
+        area
+        for area, i, j in iter_pairs_by_area(tiles)
+        if index.contains_rectangle(tiles[i], tiles[j])
+    )
+    assert area == 1560475800